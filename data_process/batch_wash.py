@@ -0,0 +1,159 @@
+# wash every Locust log of a campaign in parallel
+# Finds results/<arch>/locustfile_{pacing}_{users}_{rate}_{run_time}_{iteration}[_{arrival}].log[.gz|.zst] below the
+# results directory and runs log_wash on each of them in a process pool, one log per core.
+# The run parameters from the file name become extra csv columns (or file metadata for the columnar
+# formats), logs whose output is newer than the log are skipped, and runs.csv indexes all outputs.
+# The saturated column of runs.csv is 1 for runs the generator flagged as saturated, 0 for clean runs
+# and empty for runs recorded before the flag existed. A log that fails to wash is reported and left out of
+# the index, the others are washed and indexed all the same and the exit status is non-zero.
+# Logs of schedule.py (results/<arch>/schedule_{spec}_{iteration}[_{arrival}].log) are washed as well, with
+# the profile of the running stage per request (a Profile column, or the stage switches in the metadata
+# of the columnar formats), and indexed in schedules.csv; runs.csv and the stats scripts stay per profile.
+# Usage: python batch_wash.py [results_dir] [output_dir] [--format csv|arrow|parquet|npy] [--workers N]
+import argparse
+import csv
+import glob
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import log_wash
+
+results_dir = '../train_system/results'
+output_dir = '../train_system/results/washed'
+
+RUN_COLUMNS = ['architecture', 'pacing', 'users', 'rate', 'run_time', 'iteration', 'arrival']
+RUN_HEADER = ['Architecture', 'Pacing', 'Users', 'Rate', 'Run Time', 'Iteration', 'Arrival']
+INDEX_HEADER = ['log_file', 'output_file'] + RUN_COLUMNS + ['rows', 'saturated']
+SCHEDULE_COLUMNS = ['architecture', 'schedule', 'iteration', 'arrival']
+SCHEDULE_HEADER = ['Architecture', 'Schedule', 'Iteration', 'Arrival']
+SCHEDULE_INDEX_HEADER = ['log_file', 'output_file'] + SCHEDULE_COLUMNS + ['rows', 'saturated']
+EXTENSIONS = {'csv': '.csv', 'arrow': '.arrow', 'parquet': '.parquet', 'npy': '.npy'}
+
+
+def find_logs(root):
+    paths = glob.glob(os.path.join(root, '**', 'locustfile_*.log*'), recursive=True)
+    return sorted(path for path in paths if log_wash.parse_run_name(path))
+
+
+def find_schedules(root):
+    paths = glob.glob(os.path.join(root, '**', 'schedule_*.log*'), recursive=True)
+    return sorted(path for path in paths if log_wash.parse_schedule_name(path))
+
+
+def output_path(log_path, root, out_root, output_format):
+    relative = os.path.relpath(log_path, root)
+    stem = relative[:relative.rindex('.log')]
+    return os.path.join(out_root, stem + EXTENSIONS[output_format])
+
+
+def is_up_to_date(log_path, out_path):
+    return os.path.exists(out_path) and os.path.getmtime(out_path) >= os.path.getmtime(log_path)
+
+
+def wash_one(log_path, out_path, output_format, chunk_size):
+    schedule = log_wash.parse_schedule_name(log_path)
+    run = schedule or log_wash.parse_run_name(log_path)
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+    # write next to the target and rename, so an interrupted wash never looks up to date
+    tmp_path = out_path + '.tmp'
+    if output_format == 'csv':
+        if schedule:
+            values = [run[column] for column in SCHEDULE_COLUMNS]
+            records = (values + list(record) for record in log_wash.read_stage_records(log_path, chunk_size))
+            header = SCHEDULE_HEADER + log_wash.SCHEDULE_HEADER
+        else:
+            values = [run[column] for column in RUN_COLUMNS]
+            records = (values + list(record) for record in log_wash.read_records(log_path, chunk_size))
+            header = RUN_HEADER + log_wash.CSV_HEADER
+        rows = log_wash.write_csv(records, tmp_path, header)
+    else:
+        from columnar import WRITERS
+        metadata = {'log_file': os.path.basename(log_path), **run, 'saturated': log_wash.saturation_flag(log_path)}
+        if schedule:
+            metadata['stages'] = log_wash.read_stages(log_path, chunk_size)
+        rows = WRITERS[output_format](log_wash.read_records(log_path, chunk_size), tmp_path, metadata)
+    if os.path.isdir(out_path):
+        shutil.rmtree(out_path)
+    os.replace(tmp_path, out_path)
+    return rows
+
+
+def read_index(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, newline='') as index_file:
+        return {row['log_file']: row for row in csv.DictReader(index_file)}
+
+
+def write_index(path, rows, header=INDEX_HEADER):
+    with open(path, 'w', newline='') as index_file:
+        writer = csv.DictWriter(index_file, fieldnames=header)
+        writer.writeheader()
+        for log_file in sorted(rows):
+            writer.writerow(rows[log_file])
+
+
+def batch_wash(root, out_root, output_format='csv', workers=None, chunk_size=log_wash.CHUNK_SIZE, force=False):
+    os.makedirs(out_root, exist_ok=True)
+    index_path = os.path.join(out_root, 'runs.csv')
+    schedule_index_path = os.path.join(out_root, 'schedules.csv')
+    index = read_index(index_path)
+    schedule_index = read_index(schedule_index_path)
+
+    jobs = {}
+    skipped = 0
+    failed = []
+    logs = [(path, index) for path in find_logs(root)] + [(path, schedule_index) for path in find_schedules(root)]
+    for log_path, known in logs:
+        out_path = output_path(log_path, root, out_root, output_format)
+        key = os.path.relpath(log_path, root)
+        if not force and is_up_to_date(log_path, out_path) and key in known:
+            skipped += 1
+            continue
+        jobs[key] = (log_path, out_path, known)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(wash_one, log_path, out_path, output_format, chunk_size): key
+                   for key, (log_path, out_path, _) in jobs.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            log_path, out_path, known = jobs[key]
+            try:
+                rows = future.result()
+                saturated = log_wash.saturation_flag(log_path)
+            except Exception as error:
+                # a broken log must not cost the index of the others, it is washed again on the next run
+                print(f"{key}: failed ({type(error).__name__}: {error})", file=sys.stderr)
+                known.pop(key, None)
+                failed.append(key)
+                continue
+            run = log_wash.parse_run_name(log_path) or log_wash.parse_schedule_name(log_path)
+            known[key] = {'log_file': key, 'output_file': os.path.relpath(out_path, out_root), **run, 'rows': rows,
+                          'saturated': '' if saturated is None else int(saturated)}
+            print(f"{key}: {rows} rows{' (generator saturated)' if saturated else ''}")
+
+    write_index(index_path, index)
+    if schedule_index:
+        write_index(schedule_index_path, schedule_index, SCHEDULE_INDEX_HEADER)
+    return len(jobs) - len(failed), skipped, failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("results_dir", nargs="?", default=results_dir, help="Campaign results directory")
+    parser.add_argument("output_dir", nargs="?", default=output_dir, help="Where washed files are written")
+    parser.add_argument("--format", choices=log_wash.OUTPUT_FORMATS, default="csv", help="Output format")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--chunk-size", type=int, default=log_wash.CHUNK_SIZE, help="Bytes read per chunk")
+    parser.add_argument("--force", action="store_true", help="Wash logs even when the output is up to date")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    washed, skipped, failed = batch_wash(args.results_dir, args.output_dir, args.format, args.workers,
+                                         args.chunk_size, args.force)
+    print(f"Washed {washed} logs, skipped {skipped} up-to-date logs in {time.perf_counter() - start:.1f}s")
+    if failed:
+        sys.exit(f"{len(failed)} logs failed: {', '.join(sorted(failed))}")
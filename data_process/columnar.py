@@ -0,0 +1,241 @@
+# Typed columnar output for washed Locust request logs
+# Columns: timestamp_ns (int64, epoch ns), method and endpoint (categorical), response_time_ms (float32),
+# size_bytes (int32) and schedule_lag_ms (float32). The run parameters are stored as file metadata.
+# Formats:
+#   arrow   - Arrow IPC file, loaded through a memory map without parsing (needs pyarrow)
+#   parquet - Parquet file, smallest on disk (needs pyarrow)
+#   npy     - a directory with one .npy file per column plus meta.json, memory-mappable with numpy only
+# Records are converted in fixed-size batches, so memory stays flat like the csv path of log_wash.py.
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+FORMATS = ("arrow", "parquet", "npy")
+BATCH_ROWS = 1 << 16
+META_KEY = b"loadgen.run"
+
+COLUMNS = ("timestamp_ns", "method", "endpoint", "response_time_ms", "size_bytes", "schedule_lag_ms")
+CATEGORICAL = ("method", "endpoint")
+DTYPES = {
+    "timestamp_ns": np.int64,
+    "method": np.int32,
+    "endpoint": np.int32,
+    "response_time_ms": np.float32,
+    "size_bytes": np.int32,
+    "schedule_lag_ms": np.float32,
+}
+
+
+class TimestampParser:
+    # log timestamps look like '2024-06-26 11:04:06,718' in the generator's local time;
+    # the second part is parsed once per distinct second
+    def __init__(self):
+        self._second = None
+        self._epoch = 0
+
+    def __call__(self, text):
+        second, _, millis = text.partition(',')
+        if second != self._second:
+            self._second = second
+            self._epoch = int(time.mktime(time.strptime(second, "%Y-%m-%d %H:%M:%S")))
+        return self._epoch * 1_000_000_000 + int(millis or 0) * 1_000_000
+
+
+class Categories:
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def code(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ColumnBatcher:
+
+    def __init__(self, batch_rows=BATCH_ROWS):
+        self.batch_rows = batch_rows
+        self.categories = {name: Categories() for name in CATEGORICAL}
+        self.rows = 0
+        self._timestamp = TimestampParser()
+
+    def batches(self, records):
+        # records are (timestamp, method, endpoint, response_time, size, lag) text tuples from log_wash
+        method_codes = self.categories["method"].code
+        endpoint_codes = self.categories["endpoint"].code
+        parse_timestamp = self._timestamp
+        columns = {name: [] for name in COLUMNS}
+        for timestamp, method, endpoint, response_time, size, lag in records:
+            columns["timestamp_ns"].append(parse_timestamp(timestamp))
+            columns["method"].append(method_codes(method))
+            columns["endpoint"].append(endpoint_codes(endpoint))
+            columns["response_time_ms"].append(float(response_time))
+            columns["size_bytes"].append(int(size))
+            columns["schedule_lag_ms"].append(float(lag))
+            if len(columns["timestamp_ns"]) >= self.batch_rows:
+                yield self._to_arrays(columns)
+                columns = {name: [] for name in COLUMNS}
+        if columns["timestamp_ns"]:
+            yield self._to_arrays(columns)
+
+    def _to_arrays(self, columns):
+        arrays = {name: np.asarray(values, dtype=DTYPES[name]) for name, values in columns.items()}
+        self.rows += len(arrays["timestamp_ns"])
+        return arrays
+
+
+def _require_pyarrow(fmt):
+    if pa is None:
+        raise RuntimeError(f"The '{fmt}' format needs the 'pyarrow' package, use --format npy without it")
+
+
+def _arrow_schema(metadata):
+    return pa.schema([
+        ("timestamp_ns", pa.int64()),
+        ("method", pa.dictionary(pa.int32(), pa.string())),
+        ("endpoint", pa.dictionary(pa.int32(), pa.string())),
+        ("response_time_ms", pa.float32()),
+        ("size_bytes", pa.int32()),
+        ("schedule_lag_ms", pa.float32()),
+    ], metadata={META_KEY: json.dumps(metadata).encode()})
+
+
+def _arrow_batch(arrays, categories, schema):
+    # every batch carries the dictionary seen so far; it only ever grows, so the writer
+    # can emit it as a delta instead of a replacement
+    columns = []
+    for name in COLUMNS:
+        if name in CATEGORICAL:
+            dictionary = pa.array(categories[name].values, type=pa.string())
+            columns.append(pa.DictionaryArray.from_arrays(pa.array(arrays[name]), dictionary))
+        else:
+            columns.append(pa.array(arrays[name]))
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def write_arrow(records, path, metadata=None, batch_rows=BATCH_ROWS):
+    _require_pyarrow("arrow")
+    batcher = ColumnBatcher(batch_rows)
+    schema = _arrow_schema(metadata or {})
+    options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, schema, options=options) as writer:
+        for arrays in batcher.batches(records):
+            writer.write_batch(_arrow_batch(arrays, batcher.categories, schema))
+    return batcher.rows
+
+
+def write_parquet(records, path, metadata=None, batch_rows=BATCH_ROWS):
+    _require_pyarrow("parquet")
+    batcher = ColumnBatcher(batch_rows)
+    schema = _arrow_schema(metadata or {})
+    with pq.ParquetWriter(path, schema) as writer:
+        for arrays in batcher.batches(records):
+            writer.write_batch(_arrow_batch(arrays, batcher.categories, schema))
+    return batcher.rows
+
+
+def write_npy(records, path, metadata=None, batch_rows=BATCH_ROWS):
+    # the row count is only known at the end, so each column is streamed into a raw file
+    # first and the .npy header is written in front of it afterwards
+    batcher = ColumnBatcher(batch_rows)
+    os.makedirs(path, exist_ok=True)
+    raw_paths = {name: os.path.join(path, f"{name}.raw") for name in COLUMNS}
+    raw_files = {name: open(raw_path, 'wb') for name, raw_path in raw_paths.items()}
+    try:
+        for arrays in batcher.batches(records):
+            for name, array in arrays.items():
+                raw_files[name].write(array.tobytes())
+    finally:
+        for raw_file in raw_files.values():
+            raw_file.close()
+
+    for name, raw_path in raw_paths.items():
+        header = {"descr": np.lib.format.dtype_to_descr(np.dtype(DTYPES[name])),
+                  "fortran_order": False, "shape": (batcher.rows,)}
+        with open(os.path.join(path, f"{name}.npy"), 'wb') as npy_file, open(raw_path, 'rb') as raw_file:
+            np.lib.format.write_array_header_1_0(npy_file, header)
+            shutil.copyfileobj(raw_file, npy_file)
+        os.remove(raw_path)
+
+    meta = {
+        "rows": batcher.rows,
+        "categories": {name: batcher.categories[name].values for name in CATEGORICAL},
+        "run": metadata or {},
+    }
+    with open(os.path.join(path, "meta.json"), 'w') as meta_file:
+        json.dump(meta, meta_file, indent=2)
+    return batcher.rows
+
+
+WRITERS = {
+    "arrow": write_arrow,
+    "parquet": write_parquet,
+    "npy": write_npy,
+}
+
+
+def _concat(arrays, dtype):
+    # a single chunk is returned as is, so a one-batch arrow file stays zero-copy
+    if len(arrays) == 1:
+        return arrays[0]
+    if not arrays:
+        return np.empty(0, dtype=dtype)
+    return np.concatenate(arrays)
+
+
+def _missing(name, rows):
+    # files washed before a column existed; schedule_lag_ms then reads as on schedule
+    return np.zeros(rows, dtype=DTYPES[name])
+
+
+def _load_arrow_table(table):
+    columns, categories = {}, {}
+    for name in COLUMNS:
+        if name not in table.column_names:
+            columns[name] = _missing(name, table.num_rows)
+            continue
+        column = table.column(name)
+        if name in CATEGORICAL:
+            chunks = column.unify_dictionaries().chunks
+            categories[name] = chunks[0].dictionary.to_pylist() if chunks else []
+            columns[name] = _concat([chunk.indices.to_numpy() for chunk in chunks], DTYPES[name])
+        else:
+            columns[name] = _concat([chunk.to_numpy() for chunk in column.chunks], DTYPES[name])
+    metadata = table.schema.metadata or {}
+    run = json.loads(metadata[META_KEY]) if META_KEY in metadata else {}
+    return columns, categories, run
+
+
+def load_columns(path):
+    # returns (columns, categories, run metadata); categorical columns come back as int32 codes
+    # into categories[name]
+    if os.path.isdir(path):
+        with open(os.path.join(path, "meta.json")) as meta_file:
+            meta = json.load(meta_file)
+        columns = {}
+        for name in COLUMNS:
+            npy_path = os.path.join(path, f"{name}.npy")
+            exists = os.path.exists(npy_path)
+            columns[name] = np.load(npy_path, mmap_mode='r') if exists else _missing(name, meta["rows"])
+        return columns, meta["categories"], meta["run"]
+    _require_pyarrow("arrow")
+    with open(path, 'rb') as probe:
+        is_parquet = probe.read(4) == b"PAR1"
+    if is_parquet:
+        return _load_arrow_table(pq.read_table(path, memory_map=True))
+    with pa.memory_map(path, 'r') as source:
+        return _load_arrow_table(pa.ipc.open_file(source).read_all())
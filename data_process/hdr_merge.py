@@ -0,0 +1,139 @@
+# merge the latency histograms the generator writes next to its logs
+# Finds results/<arch>/locustfile_{pacing}_{users}_{rate}_{run_time}_{iteration}[_{arrival}].hdr.json.gz,
+# adds up the bucket counts of all windows and iterations of a run configuration per endpoint (and
+# over all endpoints as "*"), and writes count, percentiles and max - raw and corrected for the
+# schedule lag - to a csv. Merging only adds counts, so the result is the same as one histogram
+# recorded over all iterations. --merged-dir also writes the merged histograms, in the input format.
+# Runs whose generator was saturated (see log_wash.saturation_flag) are skipped unless --include-saturated.
+# Usage: python hdr_merge.py [results_dir] [summary_csv] [--merged-dir DIR] [--include-saturated]
+import argparse
+import csv
+import glob
+import gzip
+import json
+import os
+import sys
+
+import log_wash
+
+# the bucket layout and codec of the generator, so both sides always read the same histograms
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'train_system'))
+from loadgen.hdr import HdrLayout, add_counts, decode, encode, percentiles
+
+results_dir = '../train_system/results'
+summary_filename = '../train_system/results/hdr_summary.csv'
+
+SUFFIX = '.hdr.json.gz'
+PERCENTILES = (50, 90, 95, 99, 99.9)
+ALL_ENDPOINTS = '*'
+GROUP_COLUMNS = ['architecture', 'pacing', 'users', 'rate', 'run_time', 'arrival']
+LATENCY_COLUMNS = [f"p{str(q).replace('.', '_')}_ms" for q in PERCENTILES] + ['max_ms']
+SUMMARY_HEADER = (GROUP_COLUMNS + ['endpoint', 'iterations', 'count'] + LATENCY_COLUMNS
+                  + ['corrected_count'] + [f'corrected_{column}' for column in LATENCY_COLUMNS])
+
+
+def read_histograms(path):
+    with gzip.open(path, 'rt') as dump_file:
+        return json.load(dump_file)
+
+
+def find_histograms(root):
+    paths = glob.glob(os.path.join(root, '**', f'locustfile_*{SUFFIX}'), recursive=True)
+    return sorted(path for path in paths if run_of(path))
+
+
+def run_of(path):
+    return log_wash.parse_run_name(path[:-len(SUFFIX)] + '.log')
+
+
+def summary(layout, counts):
+    # count, percentiles and max in ms, empty cells without counts
+    values = percentiles(layout, counts, PERCENTILES)
+    return sum(counts.values()), values or [''] * len(LATENCY_COLUMNS)
+
+
+class MergedRun:
+
+    def __init__(self, digits):
+        self.layout = HdrLayout(digits)
+        self.iterations = 0
+        self.counts = {}
+        self.corrected = {}
+
+    def add(self, dump):
+        if dump['significant_digits'] != self.layout.digits or dump['unit'] != 'us':
+            raise ValueError("Histograms with different layouts cannot be merged")
+        self.iterations += 1
+        for entry in dump['histograms']:
+            for endpoint in (entry['name'], ALL_ENDPOINTS):
+                key = (entry['method'] if endpoint != ALL_ENDPOINTS else '', endpoint)
+                add_counts(self.counts.setdefault(key, {}), decode(entry['counts']))
+                if 'corrected' in entry:
+                    add_counts(self.corrected.setdefault(key, {}), decode(entry['corrected']))
+
+    def rows(self):
+        for key in sorted(self.counts, key=lambda key: (key[1] != ALL_ENDPOINTS, key[1], key[0])):
+            count, values = summary(self.layout, self.counts[key])
+            corrected_count, corrected_values = summary(self.layout, self.corrected.get(key, {}))
+            yield [key[1], self.iterations, count, *values, corrected_count, *corrected_values]
+
+    def to_json(self):
+        # one window covering all iterations, readable by this script again
+        histograms = []
+        for (method, name), counts in sorted(self.counts.items()):
+            if name == ALL_ENDPOINTS:
+                continue
+            entry = {"window": 0, "method": method, "name": name, "counts": encode(counts)}
+            if (method, name) in self.corrected:
+                entry["corrected"] = encode(self.corrected[(method, name)])
+            histograms.append(entry)
+        return {"version": 1, "unit": "us", "significant_digits": self.layout.digits, "window_s": None,
+                "start": None, "histograms": histograms}
+
+
+def merge_histograms(root, include_saturated=False):
+    merged = {}
+    for path in find_histograms(root):
+        if not include_saturated and log_wash.saturation_flag(path[:-len(SUFFIX)] + '.log'):
+            print(f"Skipping {path}: the generator was saturated")
+            continue
+        run = run_of(path)
+        group = tuple(run[column] for column in GROUP_COLUMNS)
+        dump = read_histograms(path)
+        if group not in merged:
+            merged[group] = MergedRun(dump['significant_digits'])
+        merged[group].add(dump)
+    return merged
+
+
+def group_name(group):
+    architecture, pacing, users, rate, run_time, arrival = group
+    name = f"locustfile_{pacing}_{users}_{rate}_{run_time}_merged"
+    return os.path.join(architecture, name if arrival == 'closed' else f"{name}_{arrival}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("results_dir", nargs="?", default=results_dir, help="Campaign results directory")
+    parser.add_argument("summary_file", nargs="?", default=summary_filename, help="Summary csv file")
+    parser.add_argument("--merged-dir", help="Also write the merged histograms below this directory")
+    parser.add_argument("--include-saturated", action="store_true",
+                        help="Also merge runs in which the generator was saturated")
+    args = parser.parse_args()
+
+    merged = merge_histograms(args.results_dir, args.include_saturated)
+    rows = 0
+    with open(args.summary_file, 'w', newline='') as summary_file:
+        writer = csv.writer(summary_file)
+        writer.writerow(SUMMARY_HEADER)
+        for group, run in sorted(merged.items()):
+            for row in run.rows():
+                writer.writerow(list(group) + row)
+                rows += 1
+            if args.merged_dir:
+                path = os.path.join(args.merged_dir, group_name(group) + SUFFIX)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with gzip.open(path, 'wt') as dump_file:
+                    json.dump(run.to_json(), dump_file, separators=(",", ":"))
+    print(f"Merged histograms of {sum(run.iterations for run in merged.values())} runs into {rows} rows "
+          f"in {args.summary_file}")
@@ -0,0 +1,234 @@
+# latency statistics over washed request data
+# Reads the runs indexed by batch_wash.py (runs.csv) and computes per architecture, profile and endpoint:
+# count, throughput, mean and p50/p90/p95/p99/p99.9 latency, max and bytes/s. An "*" endpoint row
+# aggregates all endpoints of an architecture/profile.
+# The corrected_* columns repeat mean, percentiles and max for the coordinated-omission-corrected
+# latency, measured from the intended instead of the actual send time (response time + schedule lag).
+# All runs are concatenated into flat numpy arrays and reduced with bincounts and one integer sort per
+# grouping, so tens of millions of rows take seconds. Columnar outputs (arrow/parquet/npy) are loaded
+# without parsing; csv outputs work too but are parsed row by row.
+# Runs flagged as generator-saturated in runs.csv are left out unless --include-saturated is given.
+# Usage: python latency_stats.py [washed_dir] [summary_csv] [--include-saturated]
+import argparse
+import csv
+import os
+import time
+
+import numpy as np
+
+from columnar import TimestampParser, load_columns
+
+washed_dir = '../train_system/results/washed'
+summary_filename = '../train_system/results/latency_summary.csv'
+
+PERCENTILES = (50, 90, 95, 99, 99.9)
+RANK_SCALE = 100 * 1000
+ALL_ENDPOINTS = '*'
+
+# the profiles differ in pacing, see PROFILES in train_system/loadgen/catalog.py
+PROFILE_BY_PACING = {
+    0.01: 'burst_high',
+    0.4: 'burst_med',
+    5.0: 'burst_low',
+    0.5: 'even_high',
+    6.0: 'even_med',
+    60.0: 'even_low',
+}
+
+LATENCY_COLUMNS = ['mean_ms'] + [f"p{str(q).replace('.', '_')}_ms" for q in PERCENTILES] + ['max_ms']
+SUMMARY_HEADER = (['architecture', 'profile', 'endpoint', 'runs', 'count', 'duration_s', 'throughput_rps']
+                  + LATENCY_COLUMNS + ['bytes_per_s'] + [f'corrected_{column}' for column in LATENCY_COLUMNS])
+
+
+def profile_name(pacing, arrival='closed'):
+    # open-loop runs are kept apart from the closed-loop runs of the same profile
+    name = PROFILE_BY_PACING.get(float(pacing), f'pacing_{pacing}')
+    return name if arrival in ('closed', '', None) else f'{name}/{arrival}'
+
+
+def load_csv_columns(path):
+    parse_timestamp = TimestampParser()
+    endpoints, codes = [], {}
+    timestamps, endpoint_codes, latency, size, lag = [], [], [], [], []
+    with open(path, newline='') as csv_file:
+        reader = csv.reader(csv_file)
+        header = next(reader)
+        first = header.index('Timestamp')
+        # csv files washed before the lag column existed have five request columns
+        has_lag = 'Schedule Lag (ms)' in header
+        for row in reader:
+            timestamp, _, endpoint, response_time, response_size = row[first:first + 5]
+            code = codes.get(endpoint)
+            if code is None:
+                code = codes[endpoint] = len(endpoints)
+                endpoints.append(endpoint)
+            timestamps.append(parse_timestamp(timestamp))
+            endpoint_codes.append(code)
+            latency.append(float(response_time))
+            size.append(int(response_size))
+            lag.append(float(row[first + 5]) if has_lag else 0.0)
+    columns = {
+        'timestamp_ns': np.asarray(timestamps, dtype=np.int64),
+        'endpoint': np.asarray(endpoint_codes, dtype=np.int32),
+        'response_time_ms': np.asarray(latency, dtype=np.float32),
+        'size_bytes': np.asarray(size, dtype=np.int32),
+        'schedule_lag_ms': np.asarray(lag, dtype=np.float32),
+    }
+    return columns, endpoints
+
+
+def load_run(path):
+    if path.endswith('.csv'):
+        return load_csv_columns(path)
+    columns, categories, _ = load_columns(path)
+    return columns, categories['endpoint']
+
+
+class Concatenated:
+    # all runs flattened into global arrays; endpoint codes are remapped to one global category list
+
+    def __init__(self):
+        self.endpoints = []
+        self.groups = []
+        self.group_seconds = []
+        self._endpoint_codes = {}
+        self._group_codes = {}
+        self._parts = {'group': [], 'endpoint': [], 'latency': [], 'size': [], 'lag': []}
+
+    def add(self, group, columns, endpoints):
+        rows = len(columns['response_time_ms'])
+        if rows == 0:
+            return
+        group_code = self._group_codes.get(group)
+        if group_code is None:
+            group_code = self._group_codes[group] = len(self.groups)
+            self.groups.append(group)
+            self.group_seconds.append(0.0)
+        timestamps = columns['timestamp_ns']
+        # a run lasts from its first to its last request; the 1 ms log resolution is the floor
+        self.group_seconds[group_code] += max(int(timestamps.max()) - int(timestamps.min()), 1_000_000) / 1e9
+
+        lookup = np.empty(len(endpoints), dtype=np.int32)
+        for code, endpoint in enumerate(endpoints):
+            global_code = self._endpoint_codes.get(endpoint)
+            if global_code is None:
+                global_code = self._endpoint_codes[endpoint] = len(self.endpoints)
+                self.endpoints.append(endpoint)
+            lookup[code] = global_code
+
+        self._parts['group'].append(np.full(rows, group_code, dtype=np.int64))
+        self._parts['endpoint'].append(lookup[np.asarray(columns['endpoint'])])
+        self._parts['latency'].append(np.asarray(columns['response_time_ms'], dtype=np.float32))
+        self._parts['size'].append(np.asarray(columns['size_bytes'], dtype=np.int64))
+        self._parts['lag'].append(np.asarray(columns['schedule_lag_ms'], dtype=np.float32))
+
+    def arrays(self):
+        if not self._parts['group']:
+            return None
+        return {name: np.concatenate(parts) for name, parts in self._parts.items()}
+
+
+def grouped_reduce(keys, latency, size):
+    # counts, sums and bytes are bincounts; for the percentiles every row is packed into one int64
+    # (group key in the high word, latency bits in the low word - non-negative float32 bit patterns
+    # sort like the floats), so a single integer sort orders rows by group and by latency inside it
+    all_counts = np.bincount(keys)
+    present = np.flatnonzero(all_counts)
+    counts = all_counts[present]
+    packed = (keys.astype(np.int64) << 32) | np.ascontiguousarray(latency, dtype=np.float32).view(np.uint32)
+    packed.sort()
+    sorted_latency = (packed & 0xFFFFFFFF).astype(np.uint32).view(np.float32)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    result = {
+        'key': present,
+        'count': counts,
+        'mean': np.bincount(keys, weights=latency)[present] / counts,
+        'max': sorted_latency[starts + counts - 1],
+        'bytes': np.bincount(keys, weights=size)[present],
+    }
+    for q in PERCENTILES:
+        # nearest-rank percentile in integers, q in thousandths of a percent (q / 100 * count is not exact)
+        q_scaled = round(q * 1000)
+        rank = np.maximum((q_scaled * counts.astype(np.int64) + RANK_SCALE - 1) // RANK_SCALE, 1)
+        result[q] = sorted_latency[starts + rank - 1]
+    return result
+
+
+def latency_values(reduced, i):
+    values = [reduced['mean'][i]] + [reduced[q][i] for q in PERCENTILES] + [reduced['max'][i]]
+    return [round(float(value), 3) for value in values]
+
+
+def summarize(data, groups, group_seconds, endpoints, group_runs):
+    n_endpoints = len(endpoints)
+    endpoint_keys = data['group'] * n_endpoints + data['endpoint']
+    corrected = data['latency'] + data['lag']
+    reductions = (
+        (grouped_reduce(endpoint_keys, data['latency'], data['size']),
+         grouped_reduce(endpoint_keys, corrected, data['size']), True),
+        (grouped_reduce(data['group'], data['latency'], data['size']),
+         grouped_reduce(data['group'], corrected, data['size']), False),
+    )
+
+    rows = []
+    for reduced, reduced_corrected, by_endpoint in reductions:
+        for i, key in enumerate(reduced['key']):
+            group_code = int(key // n_endpoints) if by_endpoint else int(key)
+            architecture, profile = groups[group_code]
+            seconds = group_seconds[group_code]
+            count = int(reduced['count'][i])
+            rows.append([
+                architecture, profile, endpoints[int(key % n_endpoints)] if by_endpoint else ALL_ENDPOINTS,
+                group_runs[group_code], count, round(seconds, 3), round(count / seconds, 3),
+                *latency_values(reduced, i),
+                round(float(reduced['bytes'][i]) / seconds, 1),
+                *latency_values(reduced_corrected, i),
+            ])
+    rows.sort(key=lambda row: (row[0], row[1], row[2] != ALL_ENDPOINTS, row[2]))
+    return rows
+
+
+def latency_summary(washed_root, include_saturated=False):
+    with open(os.path.join(washed_root, 'runs.csv'), newline='') as index_file:
+        runs = list(csv.DictReader(index_file))
+    if not include_saturated:
+        saturated = [run['log_file'] for run in runs if run.get('saturated') == '1']
+        for log_file in saturated:
+            print(f"Skipping {log_file}: the generator was saturated")
+        runs = [run for run in runs if run.get('saturated') != '1']
+
+    data = Concatenated()
+    runs_per_group = {}
+    for run in runs:
+        group = (run['architecture'], profile_name(run['pacing'], run.get('arrival')))
+        columns, endpoints = load_run(os.path.join(washed_root, run['output_file']))
+        data.add(group, columns, endpoints)
+        if len(columns['response_time_ms']):
+            runs_per_group[group] = runs_per_group.get(group, 0) + 1
+
+    arrays = data.arrays()
+    if arrays is None:
+        return []
+    group_runs = [runs_per_group[group] for group in data.groups]
+    return summarize(arrays, data.groups, data.group_seconds, data.endpoints, group_runs)
+
+
+def write_summary(rows, path):
+    with open(path, 'w', newline='') as summary_file:
+        writer = csv.writer(summary_file)
+        writer.writerow(SUMMARY_HEADER)
+        writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("washed_dir", nargs="?", default=washed_dir, help="Output directory of batch_wash.py")
+    parser.add_argument("summary_file", nargs="?", default=summary_filename, help="Summary csv file")
+    parser.add_argument("--include-saturated", action="store_true",
+                        help="Also summarize runs in which the generator was saturated")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    summary = latency_summary(args.washed_dir, args.include_saturated)
+    write_summary(summary, args.summary_file)
+    print(f"Wrote {len(summary)} summary rows to {args.summary_file} in {time.perf_counter() - start:.1f}s")
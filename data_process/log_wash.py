@@ -1,29 +1,211 @@
 # convert log file to csv file, filter out the necessary data
-# the csv file contains the following columns: Timestamp, Method, Endpoint, Response Time (ms), Size (bytes)
+# the csv file contains the following columns: Timestamp, Method, Endpoint, Response Time (ms), Size (bytes),
+# Schedule Lag (ms) - how much later than intended the request was sent (0 for logs without lag records)
+# The log is streamed in fixed-size chunks and the csv is written row by row, so memory stays flat
+# regardless of the log size. gzip (.gz) and zstd (.zst) compressed logs are read transparently.
+# With --format arrow|parquet|npy the output is written as typed columns instead (see columnar.py),
+# with the run parameters parsed from the log file name stored as metadata.
+# A run the generator flagged as saturated (<log name>.saturation.json, see train_system/loadgen/saturation.py)
+# is washed like any other, but reported, and the flag is kept for batch_wash.py and the stats scripts.
+# Logs of train_system/schedule.py (schedule_{spec}_{iteration}[_{arrival}].log) run several profiles;
+# their csv starts with a Profile column, the profile of the stage running when the request was logged.
+# Usage: python log_wash.py [log_file] [output_file] [--format csv|arrow|parquet|npy]
 # Written by: Yiming Zhao
+import argparse
 import csv
+import gzip
+import json
+import os
 import re
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 log_filename = '../train_system/locustfile.log'
 csv_filename = '../train_system/results/locust_requests.csv'
 
+CHUNK_SIZE = 1 << 20
+CSV_HEADER = ['Timestamp', 'Method', 'Endpoint', 'Response Time (ms)', 'Size (bytes)', 'Schedule Lag (ms)']
+OUTPUT_FORMATS = ('csv', 'arrow', 'parquet', 'npy')
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
 log_pattern = re.compile(
-    r'\[(?P<timestamp>[\d\-:\s,]+)]\s+[^\]]+/INFO/locust:\s+(?P<status>SUCCESS|FAILURE):\s+(?P<method>\w+)\s+('
-    r'?P<endpoint>[\S]+)\s+(?P<response_time>[\d.]+)ms\s+(?P<size>\d+)\s+bytes'
+    rb'\[(?P<timestamp>[\d\-:\s,]+)]\s+[^\]]+/INFO/locust:\s+(?P<status>SUCCESS|FAILURE):\s+(?P<method>\w+)\s+('
+    rb'?P<endpoint>[\S]+)\s+(?P<response_time>[\d.]+)ms\s+(?P<size>\d+)\s+bytes(?:\s+lag\s+(?P<lag>[\d.]+)ms)?'
+)
+
+# results/<arch>/locustfile_{pacing}_{users}_{rate}_{run_time}_{iteration}[_{arrival}].log[.gz|.zst]
+# (open-loop runs carry their arrival mode, closed-loop runs have no suffix)
+run_name_pattern = re.compile(
+    r'locustfile_(?P<pacing>[\d.]+)_(?P<users>\d+)_(?P<rate>\d+)_(?P<run_time>[^_]+)_(?P<iteration>\d+)'
+    r'(?:_(?P<arrival>[a-z]+))?\.log(?:\.gz|\.zst)?$'
 )
-with open(log_filename, 'r') as log_file:
-    log_lines = log_file.readlines()
-with open(csv_filename, 'w', newline='') as csv_file:
-    csv_writer = csv.writer(csv_file)
-    csv_writer.writerow(['Timestamp', 'Method', 'Endpoint', 'Response Time (ms)', 'Size (bytes)'])
-    for line in log_lines:
+# results/<arch>/schedule_{spec}_{iteration}[_{arrival}].log[.gz|.zst], written by train_system/schedule.py
+schedule_name_pattern = re.compile(
+    r'schedule_(?P<schedule>.+?)_(?P<iteration>\d+)(?:_(?P<arrival>[a-z]+))?\.log(?:\.gz|\.zst)?$'
+)
+# the stage switches logged by the schedule's load shape, see train_system/loadgen/shapes.py
+stage_pattern = re.compile(rb'/INFO/locust:\s+Stage\s+\d+/\d+:\s+(?P<profile>\S+)\s')
+SCHEDULE_HEADER = ['Profile'] + CSV_HEADER
+
+
+def parse_run_name(path):
+    # run parameters encoded in the launcher's log file name, None when the name does not match
+    match = run_name_pattern.search(os.path.basename(path))
+    if not match:
+        return None
+    return {
+        'architecture': os.path.basename(os.path.dirname(os.path.abspath(path))),
+        'pacing': float(match.group('pacing')),
+        'users': int(match.group('users')),
+        'rate': int(match.group('rate')),
+        'run_time': match.group('run_time'),
+        'iteration': int(match.group('iteration')),
+        'arrival': match.group('arrival') or 'closed',
+    }
+
+
+def parse_schedule_name(path):
+    # parameters of a schedule.py log, None when the name does not match
+    match = schedule_name_pattern.search(os.path.basename(path))
+    if not match:
+        return None
+    return {
+        'architecture': os.path.basename(os.path.dirname(os.path.abspath(path))),
+        'schedule': match.group('schedule'),
+        'iteration': int(match.group('iteration')),
+        'arrival': match.group('arrival') or 'closed',
+    }
+
+
+def saturation_flag(path):
+    # True/False from the generator's saturation file next to the log, None for runs without one
+    stem = path[:path.rindex('.log')] if '.log' in os.path.basename(path) else path
+    flag_path = stem + '.saturation.json'
+    if not os.path.exists(flag_path):
+        return None
+    with open(flag_path) as flag_file:
+        return bool(json.load(flag_file).get('saturated'))
+
+
+def open_log(path):
+    # pick the decompressor from the magic bytes rather than the file extension
+    with open(path, 'rb') as probe:
+        magic = probe.read(4)
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.open(path, 'rb')
+    if magic.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise RuntimeError(f"{path} is zstd-compressed, install the 'zstandard' package to read it")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return open(path, 'rb')
+
+
+def iter_lines(stream, chunk_size=CHUNK_SIZE):
+    tail = b''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        lines = (tail + chunk).split(b'\n')
+        tail = lines.pop()
+        yield from lines
+    if tail:
+        yield tail
+
+
+def iter_records(lines):
+    for line in lines:
         match = log_pattern.search(line)
         if match:
-            timestamp = match.group('timestamp').strip()
-            method = match.group('method').strip()
-            endpoint = match.group('endpoint').strip()
-            response_time = match.group('response_time').strip()
-            size = match.group('size').strip()
-            csv_writer.writerow([timestamp, method, endpoint, response_time, size])
-
-print(f"Log data has been successfully converted to {csv_filename}")
+            yield (
+                match.group('timestamp').strip().decode(),
+                match.group('method').decode(),
+                match.group('endpoint').decode(),
+                match.group('response_time').decode(),
+                match.group('size').decode(),
+                (match.group('lag') or b'0').decode(),
+            )
+
+
+def read_records(path, chunk_size=CHUNK_SIZE):
+    with open_log(path) as stream:
+        yield from iter_records(iter_lines(stream, chunk_size))
+
+
+def iter_stage_records(lines):
+    # records of a schedule log prefixed with the profile of the current stage ('' before the first)
+    profile = ['']
+
+    def requests(lines):
+        for line in lines:
+            if b'Stage ' in line:
+                match = stage_pattern.search(line)
+                if match:
+                    profile[0] = match.group('profile').decode()
+                    continue
+            yield line
+
+    for record in iter_records(requests(lines)):
+        yield (profile[0],) + record
+
+
+def read_stage_records(path, chunk_size=CHUNK_SIZE):
+    with open_log(path) as stream:
+        yield from iter_stage_records(iter_lines(stream, chunk_size))
+
+
+def read_stages(path, chunk_size=CHUNK_SIZE):
+    # [timestamp, profile] of every stage switch, stored with the columnar output of schedule logs
+    stages = []
+    with open_log(path) as stream:
+        for line in iter_lines(stream, chunk_size):
+            if b'Stage ' in line:
+                match = stage_pattern.search(line)
+                if match:
+                    stages.append([line[1:line.index(b']')].decode(), match.group('profile').decode()])
+    return stages
+
+
+def write_csv(records, path, header=CSV_HEADER):
+    count = 0
+    with open(path, 'w', newline='') as csv_file:
+        csv_writer = csv.writer(csv_file)
+        csv_writer.writerow(header)
+        for record in records:
+            csv_writer.writerow(record)
+            count += 1
+    return count
+
+
+def wash(log_path, output_path, chunk_size=CHUNK_SIZE, output_format='csv'):
+    schedule = parse_schedule_name(log_path)
+    if output_format == 'csv':
+        if schedule:
+            return write_csv(read_stage_records(log_path, chunk_size), output_path, SCHEDULE_HEADER)
+        return write_csv(read_records(log_path, chunk_size), output_path)
+    from columnar import WRITERS
+    metadata = {'log_file': os.path.basename(log_path), **(parse_run_name(log_path) or schedule or {}),
+                'saturated': saturation_flag(log_path)}
+    if schedule:
+        metadata['stages'] = read_stages(log_path, chunk_size)
+    return WRITERS[output_format](read_records(log_path, chunk_size), output_path, metadata)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("log_file", nargs="?", default=log_filename, help="Locust log (plain, .gz or .zst)")
+    parser.add_argument("output_file", nargs="?", default=csv_filename,
+                        help="Output csv file (a .arrow/.parquet file or a directory for npy)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="csv", help="Output format")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Bytes read per chunk")
+    args = parser.parse_args()
+
+    rows = wash(args.log_file, args.output_file, args.chunk_size, args.format)
+    if saturation_flag(args.log_file):
+        print(f"Warning: the generator was saturated during {args.log_file}, its latencies are not trustworthy")
+    print(f"Log data has been successfully converted to {args.output_file} ({rows} rows)")
@@ -0,0 +1,264 @@
+# indexed SQLite catalog of all runs of a campaign
+# Ingests every results/<arch>/locustfile_*.log[.gz|.zst] below the results directory once: the run
+# parameters from the file name (profile and request limit follow from the pacing), the first and last
+# request timestamps, request and failure counts, the generator health written next to the log
+# (<log name>.saturation.json and .pacing.json) and per-endpoint count, mean, percentiles and max -
+# raw and corrected for the schedule lag - computed as in latency_stats.py. Logs are read in a process
+# pool, runs whose log and health files did not change since the last ingest are skipped.
+# Queries then run against the database instead of the logs, e.g.
+#   SELECT r.iteration, e.p95_ms FROM endpoint_stats e JOIN runs r ON r.id = e.run_id
+#   WHERE e.service = 'travelplanservice' AND r.architecture = 'coarse' AND r.profile = 'even_high'
+# Usage: python run_catalog.py [results_dir] [db_file] [--workers N] [--force] [--query SQL]
+import argparse
+import glob
+import json
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+
+import log_wash
+from latency_stats import PERCENTILES, grouped_reduce, profile_name
+
+results_dir = '../train_system/results'
+db_filename = '../train_system/results/runs.sqlite'
+
+# requests per service of each profile, see PROFILES in train_system/loadgen/catalog.py
+LIMIT_BY_PROFILE = {
+    'burst_high': 200,
+    'burst_med': 20,
+    'burst_low': 2,
+    'even_high': 200,
+    'even_med': 20,
+    'even_low': 2,
+}
+PERCENTILE_COLUMNS = [f"p{str(q).replace('.', '_')}_ms" for q in PERCENTILES]
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S,%f'
+
+failure_pattern = re.compile(rb'FAILURE:\s+(?P<method>\w+)\s+(?P<endpoint>\S+)')
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    log_file TEXT NOT NULL UNIQUE,
+    source_mtime REAL NOT NULL,
+    architecture TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    pacing REAL NOT NULL,
+    request_limit INTEGER,
+    users INTEGER NOT NULL,
+    rate INTEGER NOT NULL,
+    run_time TEXT NOT NULL,
+    iteration INTEGER NOT NULL,
+    arrival TEXT NOT NULL,
+    started TEXT,
+    finished TEXT,
+    duration_s REAL,
+    requests INTEGER NOT NULL,
+    failures INTEGER NOT NULL,
+    saturated INTEGER,
+    cpu_max_percent REAL,
+    loop_lag_max_ms REAL,
+    achieved_rate REAL,
+    drift_p99_ms REAL,
+    ingested TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS endpoint_stats (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    method TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    service TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    failures INTEGER NOT NULL,
+    mean_ms REAL,
+    {', '.join(f'{column} REAL' for column in PERCENTILE_COLUMNS)},
+    max_ms REAL,
+    corrected_mean_ms REAL,
+    {', '.join(f'corrected_{column} REAL' for column in PERCENTILE_COLUMNS)},
+    corrected_max_ms REAL,
+    PRIMARY KEY (run_id, method, endpoint)
+);
+CREATE INDEX IF NOT EXISTS runs_configuration ON runs (architecture, profile, arrival, users, iteration);
+CREATE INDEX IF NOT EXISTS runs_pacing ON runs (pacing);
+CREATE INDEX IF NOT EXISTS endpoint_stats_service ON endpoint_stats (service, run_id);
+CREATE INDEX IF NOT EXISTS endpoint_stats_endpoint ON endpoint_stats (endpoint, run_id);
+"""
+STATS_COLUMNS = (['run_id', 'method', 'endpoint', 'service', 'count', 'failures', 'mean_ms'] + PERCENTILE_COLUMNS
+                 + ['max_ms', 'corrected_mean_ms'] + [f'corrected_{column}' for column in PERCENTILE_COLUMNS]
+                 + ['corrected_max_ms'])
+
+
+def find_logs(root):
+    paths = glob.glob(os.path.join(root, '**', 'locustfile_*.log*'), recursive=True)
+    return sorted(path for path in paths if log_wash.parse_run_name(path))
+
+
+def sidecar_paths(log_path):
+    stem = log_path[:log_path.rindex('.log')]
+    return stem + '.saturation.json', stem + '.pacing.json'
+
+
+def source_mtime(log_path):
+    # a run is ingested again when its log or one of its health files changed
+    return max(os.path.getmtime(path) for path in (log_path, *sidecar_paths(log_path)) if os.path.exists(path))
+
+
+def service_of(endpoint):
+    # /api/v1/<service>/... - the service part of the path, lowercase as in the URL
+    parts = endpoint.split('/')
+    return parts[3].lower() if len(parts) > 3 and parts[1] == 'api' else endpoint
+
+
+def read_health(log_path):
+    saturation_path, pacing_path = sidecar_paths(log_path)
+    health = {'saturated': None, 'cpu_max_percent': None, 'loop_lag_max_ms': None, 'achieved_rate': None,
+              'drift_p99_ms': None}
+    if os.path.exists(saturation_path):
+        with open(saturation_path) as saturation_file:
+            flag = json.load(saturation_file)
+        health.update(saturated=int(flag['saturated']), cpu_max_percent=flag['cpu_max_percent'],
+                      loop_lag_max_ms=flag['loop_lag_max_ms'])
+    if os.path.exists(pacing_path):
+        with open(pacing_path) as pacing_file:
+            profiles = list(json.load(pacing_file)['profiles'].values())
+        if len(profiles) == 1:
+            health.update(achieved_rate=profiles[0]['achieved_rate'], drift_p99_ms=profiles[0]['drift'].get('p99_ms'))
+    return health
+
+
+def read_run(log_path):
+    # one pass over the log: successful request records into arrays, failures counted per endpoint
+    failures = {}
+    keys, codes, latency, lag = [], {}, [], []
+    timestamps = [None, None]
+
+    def successes(lines):
+        for line in lines:
+            if b'FAILURE:' in line:
+                match = failure_pattern.search(line)
+                if match:
+                    key = (match.group('method').decode(), match.group('endpoint').decode())
+                    failures[key] = failures.get(key, 0) + 1
+                continue
+            yield line
+
+    with log_wash.open_log(log_path) as stream:
+        for timestamp, method, endpoint, response_time, _, schedule_lag in log_wash.iter_records(
+                successes(log_wash.iter_lines(stream))):
+            code = codes.get((method, endpoint))
+            if code is None:
+                code = codes[(method, endpoint)] = len(codes)
+            keys.append(code)
+            latency.append(float(response_time))
+            lag.append(float(schedule_lag))
+            if timestamps[0] is None:
+                timestamps[0] = timestamp
+            timestamps[1] = timestamp
+
+    stats = {}
+    if keys:
+        keys = np.asarray(keys, dtype=np.int64)
+        latency = np.asarray(latency, dtype=np.float32)
+        size = np.zeros(len(keys), dtype=np.int64)
+        raw = grouped_reduce(keys, latency, size)
+        corrected = grouped_reduce(keys, latency + np.asarray(lag, dtype=np.float32), size)
+        by_code = {code: key for key, code in codes.items()}
+        for i, code in enumerate(raw['key']):
+            values = ([raw['mean'][i]] + [raw[q][i] for q in PERCENTILES] + [raw['max'][i]]
+                      + [corrected['mean'][i]] + [corrected[q][i] for q in PERCENTILES] + [corrected['max'][i]])
+            stats[by_code[code]] = (int(raw['count'][i]), [round(float(value), 3) for value in values])
+    return log_path, timestamps, stats, failures
+
+
+def duration(timestamps):
+    if timestamps[0] is None:
+        return None
+    first, last = (datetime.strptime(timestamp, TIMESTAMP_FORMAT) for timestamp in timestamps)
+    return (last - first).total_seconds()
+
+
+def store_run(db, key, log_path, result):
+    _, timestamps, stats, failures = result
+    run = log_wash.parse_run_name(log_path)
+    profile = profile_name(run['pacing'])
+    db.execute("DELETE FROM endpoint_stats WHERE run_id IN (SELECT id FROM runs WHERE log_file = ?)", (key,))
+    db.execute("DELETE FROM runs WHERE log_file = ?", (key,))
+    row = {
+        'log_file': key,
+        'source_mtime': source_mtime(log_path),
+        **run,
+        'profile': profile,
+        'request_limit': LIMIT_BY_PROFILE.get(profile),
+        'started': timestamps[0],
+        'finished': timestamps[1],
+        'duration_s': duration(timestamps),
+        'requests': sum(count for count, _ in stats.values()),
+        'failures': sum(failures.values()),
+        **read_health(log_path),
+        'ingested': datetime.now().isoformat(timespec='seconds'),
+    }
+    cursor = db.execute(f"INSERT INTO runs ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                        list(row.values()))
+    run_id = cursor.lastrowid
+    rows = []
+    for method, endpoint in sorted(set(stats) | set(failures)):
+        count, values = stats.get((method, endpoint), (0, [None] * (len(STATS_COLUMNS) - 6)))
+        rows.append([run_id, method, endpoint, service_of(endpoint), count, failures.get((method, endpoint), 0),
+                     *values])
+    db.executemany(f"INSERT INTO endpoint_stats ({', '.join(STATS_COLUMNS)}) "
+                   f"VALUES ({', '.join('?' * len(STATS_COLUMNS))})", rows)
+    return row['requests']
+
+
+def ingest(root, db_path, workers=None, force=False):
+    db = sqlite3.connect(db_path)
+    db.executescript(SCHEMA)
+    known = dict(db.execute("SELECT log_file, source_mtime FROM runs"))
+
+    jobs, skipped = {}, 0
+    for log_path in find_logs(root):
+        key = os.path.relpath(log_path, root)
+        if not force and known.get(key) == source_mtime(log_path):
+            skipped += 1
+            continue
+        jobs[key] = log_path
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(read_run, log_path): key for key, log_path in jobs.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            with db:
+                requests = store_run(db, key, jobs[key], future.result())
+            print(f"{key}: {requests} requests")
+    db.close()
+    return len(jobs), skipped
+
+
+def query(db_path, sql):
+    db = sqlite3.connect(db_path)
+    cursor = db.execute(sql)
+    print('\t'.join(column[0] for column in cursor.description))
+    for row in cursor:
+        print('\t'.join('' if value is None else str(value) for value in row))
+    db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("results_dir", nargs="?", default=results_dir, help="Campaign results directory")
+    parser.add_argument("db_file", nargs="?", default=db_filename, help="SQLite database file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--force", action="store_true", help="Ingest runs again even when nothing changed")
+    parser.add_argument("--query", help="Run this SQL against the catalog instead of ingesting")
+    args = parser.parse_args()
+
+    if args.query:
+        query(args.db_file, args.query)
+    else:
+        start = time.perf_counter()
+        ingested, skipped = ingest(args.results_dir, args.db_file, args.workers, args.force)
+        print(f"Ingested {ingested} runs, skipped {skipped} unchanged runs in {time.perf_counter() - start:.1f}s")
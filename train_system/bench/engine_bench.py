@@ -0,0 +1,100 @@
+# Benchmark: requests-based HttpUser vs geventhttpclient-based FastHttpUser on one generator core
+# A zero-latency local server answers every request; the locust process is run headless with
+# an increasing number of users for each engine, and its requests/s and CPU time are reported.
+# When the CPU column approaches 100% the single generator core is saturated.
+# Usage: python bench/engine_bench.py --users 10 50 100 200 --run-time 10
+import argparse
+import csv
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(bench_dir))
+from loadgen.engine import ENGINES, ENGINE_ENV
+
+body = b'{"status":1,"msg":"Success","data":[]}'
+
+
+def serve(port):
+    import socket
+    from gevent.pywsgi import WSGIHandler, WSGIServer
+
+    class NoDelayHandler(WSGIHandler):
+        # headers and body are written separately, so Nagle + delayed ACK would add ~40 ms
+        def handle(self):
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            super().handle()
+
+    def app(environ, start_response):
+        start_response("200 OK", [("Content-Type", "application/json"), ("Content-Length", str(len(body)))])
+        return [body]
+
+    WSGIServer(("127.0.0.1", port), app, log=None, handler_class=NoDelayHandler).serve_forever()
+
+
+def child_cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_locust(engine, users, run_time, port, out_dir):
+    prefix = os.path.join(out_dir, f"{engine}_{users}")
+    command = [
+        sys.executable, "-m", "locust",
+        "-f", os.path.join(bench_dir, "engine_locustfile.py"),
+        "--headless",
+        "-u", str(users),
+        "-r", str(users),
+        "--run-time", f"{run_time}s",
+        "--host", f"http://127.0.0.1:{port}",
+        "--csv", prefix,
+        "--only-summary",
+        "--loglevel", "WARNING",
+    ]
+    env = dict(os.environ, **{ENGINE_ENV: engine})
+    cpu_before = child_cpu_seconds()
+    wall_before = time.perf_counter()
+    subprocess.run(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wall = time.perf_counter() - wall_before
+    cpu = child_cpu_seconds() - cpu_before
+
+    with open(f"{prefix}_stats.csv", newline="") as stats_file:
+        for row in csv.DictReader(stats_file):
+            if row["Name"] == "Aggregated":
+                requests = int(row["Request Count"])
+                failures = int(row["Failure Count"])
+                rps = float(row["Requests/s"])
+                break
+        else:
+            requests, failures, rps = 0, 0, 0.0
+    return requests, failures, rps, cpu, wall
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--run-time", type=int, default=10, help="Seconds per run")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument("--port", type=int, default=18089)
+    args = parser.parse_args()
+
+    server = multiprocessing.get_context("spawn").Process(target=serve, args=(args.port,), daemon=True)
+    server.start()
+    time.sleep(1)
+
+    try:
+        with tempfile.TemporaryDirectory() as out_dir:
+            print(f"{'engine':>9} {'users':>6} {'requests':>9} {'fail':>5} {'req/s':>9} {'cpu %':>6} {'cpu ms/1k':>10}")
+            for users in args.users:
+                for engine in args.engines:
+                    requests, failures, rps, cpu, wall = run_locust(engine, users, args.run_time, args.port, out_dir)
+                    cpu_per_1k = cpu * 1000 / requests * 1000 if requests else 0.0
+                    print(f"{engine:>9} {users:>6} {requests:>9} {failures:>5} {rps:>9.1f} "
+                          f"{100 * cpu / wall:>6.1f} {cpu_per_1k:>10.1f}")
+    finally:
+        server.terminate()
@@ -0,0 +1,16 @@
+# Locustfile used by engine_bench.py: one user class hammering a single endpoint with no wait
+import os
+import sys
+
+from locust import task, constant
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from loadgen.engine import user_base
+
+
+class BenchUser(user_base()):
+    wait_time = constant(0)
+
+    @task
+    def get_request(self):
+        self.client.get("/api/v1/priceservice/prices")
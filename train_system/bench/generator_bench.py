@@ -0,0 +1,196 @@
+# Benchmark: what the load generator itself sustains for each profile
+# Starts bench/standin_server.py with zero latency on the architecture's ports and runs the profile
+# scripts' locustfiles against it, once per engine and request-log mode. Against a server that answers
+# at once every shortfall from the profile's intended rate (users / pacing) is the generator's.
+# Reported per run: sustained req/s over the seconds in which requests completed, intended req/s,
+# generator CPU seconds per 1k requests, peak memory per simulated user (above a run without users)
+# and failures. Every run is appended to bench/results/generator_bench.csv with the commit and host,
+# and compared with the previous stored run of the same configuration.
+# Usage: python bench/generator_bench.py --arch coarse --profiles burst_high even_high --run-time 15
+import argparse
+import csv
+import os
+import platform
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+base_dir = os.path.dirname(bench_dir)
+sys.path.insert(0, base_dir)
+from loadgen.catalog import PROFILES
+from loadgen.engine import ENGINES, ENGINE_ENV
+from loadgen.sink import SINK_ENV, SINK_MODES
+
+SCRIPT_DIRS = {
+    "coarse": "coarse_script",
+    "medium": "medium_script",
+    "fine": "fine_script",
+}
+RESULTS_FILE = os.path.join(bench_dir, "results", "generator_bench.csv")
+RESULTS_HEADER = ["started", "commit", "host", "python", "architecture", "profile", "engine", "request_log",
+                  "users", "run_time", "requests", "failures", "rps", "intended_rps", "cpu_s_per_1k",
+                  "mem_kb_per_user", "max_rss_kb"]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=base_dir, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def start_standin(architecture):
+    server = subprocess.Popen([sys.executable, os.path.join(bench_dir, "standin_server.py"), "--arch", architecture,
+                               "--latency", "const:0", "--report", "3600"], stdout=subprocess.DEVNULL)
+    time.sleep(2)
+    if server.poll() is not None:
+        sys.exit(f"The stand-in server could not listen on the ports of {architecture}, is a deployment running?")
+    return server
+
+
+def run_locust(locustfile, users, run_time, env, out_dir):
+    # returns the csv prefix and the rusage of the locust process alone
+    prefix = os.path.join(out_dir, "run")
+    command = [
+        sys.executable, "-m", "locust",
+        "-f", locustfile,
+        "--headless",
+        "-u", str(users),
+        "-r", str(users),
+        "--run-time", f"{run_time}s",
+        "--csv", prefix,
+        "--only-summary",
+        "--logfile", os.path.join(out_dir, "run.log"),
+    ]
+    process = subprocess.Popen(command, env=env, cwd=out_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _, _, usage = os.wait4(process.pid, 0)
+    return prefix, usage
+
+
+def sustained_rps(prefix):
+    # requests over the seconds in which the completed count grew; a profile whose quotas run out
+    # before the end of the run is not averaged over its idle tail
+    counts = []
+    with open(f"{prefix}_stats_history.csv", newline="") as history_file:
+        for row in csv.DictReader(history_file):
+            if row["Name"] == "Aggregated":
+                counts.append((float(row["Timestamp"]), int(row["Total Request Count"])))
+    active = [timestamp for (timestamp, count), (_, previous) in zip(counts[1:], counts) if count > previous]
+    if not active:
+        return 0.0
+    total = counts[-1][1]
+    span = active[-1] - counts[0][0]
+    return total / span if span > 0 else float(total)
+
+
+def totals(prefix):
+    with open(f"{prefix}_stats.csv", newline="") as stats_file:
+        for row in csv.DictReader(stats_file):
+            if row["Name"] == "Aggregated":
+                return int(row["Request Count"]), int(row["Failure Count"])
+    return 0, 0
+
+
+def bench_env(engine, request_log):
+    return dict(os.environ, **{ENGINE_ENV: engine, SINK_ENV: request_log})
+
+
+def idle_rss(locustfile, engine):
+    # peak memory of the same locustfile without users
+    with tempfile.TemporaryDirectory() as out_dir:
+        _, usage = run_locust(locustfile, 0, 2, bench_env(engine, "off"), out_dir)
+    return usage.ru_maxrss
+
+
+def previous_results():
+    previous = {}
+    if os.path.exists(RESULTS_FILE):
+        with open(RESULTS_FILE, newline="") as results_file:
+            for row in csv.DictReader(results_file):
+                previous[configuration(row)] = row
+    return previous
+
+
+def configuration(row):
+    return tuple(str(row[column]) for column in ("architecture", "profile", "engine", "request_log", "users",
+                                                  "run_time"))
+
+
+def change(value, before):
+    if not before or not float(before):
+        return ""
+    return f"{(value / float(before) - 1) * 100:+.0f}%"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--arch", choices=list(SCRIPT_DIRS), default="coarse")
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=["burst_high", "even_high"])
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument("--request-logs", nargs="+", choices=SINK_MODES, default=list(SINK_MODES))
+    parser.add_argument("-u", "--users", type=int, default=80, help="Number of users")
+    parser.add_argument("--run-time", type=int, default=15, help="Seconds per run")
+    parser.add_argument("--no-store", action="store_true", help="Do not append the results to " + RESULTS_FILE)
+    args = parser.parse_args()
+
+    server = start_standin(args.arch)
+    previous = previous_results()
+    rows = []
+    try:
+        print(f"{'profile':<11} {'engine':>8} {'log':>8} {'requests':>9} {'fail':>5} {'req/s':>8} {'intended':>8} "
+              f"{'cpu s/1k':>8} {'kB/user':>8} {'vs last':>12}")
+        for profile in args.profiles:
+            locustfile = os.path.join(base_dir, SCRIPT_DIRS[args.arch], f"{profile}.py")
+            for engine in args.engines:
+                baseline = idle_rss(locustfile, engine)
+                for request_log in args.request_logs:
+                    with tempfile.TemporaryDirectory() as out_dir:
+                        prefix, usage = run_locust(locustfile, args.users, args.run_time,
+                                                   bench_env(engine, request_log), out_dir)
+                        requests, failures = totals(prefix)
+                        rps = sustained_rps(prefix)
+                    cpu = usage.ru_utime + usage.ru_stime
+                    row = {
+                        "started": datetime.now().isoformat(timespec="seconds"),
+                        "commit": git_commit(),
+                        "host": platform.node(),
+                        "python": platform.python_version(),
+                        "architecture": args.arch,
+                        "profile": profile,
+                        "engine": engine,
+                        "request_log": request_log,
+                        "users": args.users,
+                        "run_time": args.run_time,
+                        "requests": requests,
+                        "failures": failures,
+                        "rps": round(rps, 1),
+                        "intended_rps": round(args.users / PROFILES[profile].pacing, 1),
+                        "cpu_s_per_1k": round(cpu / requests * 1000, 3) if requests else "",
+                        "mem_kb_per_user": round(max(0, usage.ru_maxrss - baseline) / args.users, 1),
+                        "max_rss_kb": usage.ru_maxrss,
+                    }
+                    rows.append(row)
+                    last = previous.get(configuration(row), {})
+                    trend = (f"{change(rps, last.get('rps'))}/"
+                             f"{change(row['cpu_s_per_1k'] or 0, last.get('cpu_s_per_1k'))}") if last else ""
+                    print(f"{profile:<11} {engine:>8} {request_log:>8} {requests:>9} {failures:>5} {rps:>8.1f} "
+                          f"{row['intended_rps']:>8.1f} {row['cpu_s_per_1k'] or 0:>8.3f} "
+                          f"{row['mem_kb_per_user']:>8.1f} {trend:>12}")
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+
+    if rows and not args.no_store:
+        os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+        new_file = not os.path.exists(RESULTS_FILE)
+        with open(RESULTS_FILE, "a", newline="") as results_file:
+            writer = csv.DictWriter(results_file, fieldnames=RESULTS_HEADER)
+            if new_file:
+                writer.writeheader()
+            writer.writerows(rows)
+        print(f"Appended {len(rows)} runs to {RESULTS_FILE} (vs last: change in req/s / cpu s per 1k)")
@@ -0,0 +1,81 @@
+# Benchmark: achieved per-service RPS as the number of users grows
+# Compares the old pattern (request sent while holding the per-service lock) with TaskQuota,
+# which reserves a slot and releases it before the request goes out.
+# Each request is simulated by a gevent sleep of --latency seconds, so the numbers show the
+# concurrency limit of the client side only.
+# Usage: python bench/quota_bench.py --users 1 2 4 8 16 32 64 80 --latency 0.02
+from gevent import monkey
+
+monkey.patch_all()
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import gevent
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from loadgen.quota import TaskQuota
+
+
+def run_locked(users, limit, pacing, latency, duration):
+    counters = {"task_1": 0}
+    lock = threading.Lock()
+    done = []
+
+    def user():
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            with lock:
+                if counters["task_1"] < limit:
+                    counters["task_1"] += 1
+                    gevent.sleep(latency)
+                    done.append(time.perf_counter())
+            gevent.sleep(max(0.0, pacing - (time.perf_counter() - start)))
+
+    return _measure(users, user, done)
+
+
+def run_quota(users, limit, pacing, latency, duration):
+    quota = TaskQuota({"task_1": limit})
+    done = []
+
+    def user():
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            if quota.reserve("task_1"):
+                gevent.sleep(latency)
+                done.append(time.perf_counter())
+            gevent.sleep(max(0.0, pacing - (time.perf_counter() - start)))
+
+    return _measure(users, user, done)
+
+
+def _measure(users, user, done):
+    start = time.perf_counter()
+    gevent.joinall([gevent.spawn(user) for _ in range(users)])
+    if not done:
+        return 0, 0.0
+    elapsed = max(done) - start
+    return len(done), len(done) / elapsed if elapsed > 0 else 0.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64, 80])
+    parser.add_argument("--limit", type=int, default=200, help="Requests per service")
+    parser.add_argument("--pacing", type=float, default=0.01)
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated response time (s)")
+    parser.add_argument("--duration", type=float, default=5.0, help="Max seconds per run")
+    args = parser.parse_args()
+
+    print(f"limit={args.limit} pacing={args.pacing}s latency={args.latency}s")
+    print(f"{'users':>6} {'locked req':>11} {'locked rps':>11} {'quota req':>10} {'quota rps':>10}")
+    for users in args.users:
+        locked_count, locked_rps = run_locked(users, args.limit, args.pacing, args.latency, args.duration)
+        quota_count, quota_rps = run_quota(users, args.limit, args.pacing, args.latency, args.duration)
+        print(f"{users:>6} {locked_count:>11} {locked_rps:>11.1f} {quota_count:>10} {quota_rps:>10.1f}")
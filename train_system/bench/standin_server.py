@@ -0,0 +1,187 @@
+# Stand-in for a train-ticket deployment, for benchmarking the generator without a cluster
+# One asyncio process listens on every deployment unit of an architecture (see loadgen/topology.py) and
+# answers the catalog endpoints of the unit's services with a train-ticket style JSON envelope of about
+# the size the real services return, after a latency drawn per request. Other paths get a 404.
+# Latencies are given as distributions in ms:
+#   const:MS  uniform:LOW:HIGH  exp:MEAN  lognormal:MEDIAN:SIGMA
+# --latency sets the default, --config a JSON file overrides latency and body size per service:
+#   {"OrderService": {"latency": "lognormal:20:0.5", "size": 16000}}
+# Requests and mean latency per unit are printed every --report seconds and on exit.
+# Usage: python bench/standin_server.py --arch coarse [--latency exp:5] [--config standin.json]
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import signal
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# the endpoint table without locust, whose gevent would monkey-patch asyncio's selectors and sockets
+from loadgen.endpoints import ENDPOINTS
+from loadgen.topology import TOPOLOGY
+
+# bytes of the response body by kind of endpoint, roughly what the services return for the seed data
+SIZES = {
+    "welcome": 60,
+    "write": 300,
+    "item": 800,
+    "list": 4000,
+}
+STATUS_LINES = {200: "200 OK", 404: "404 Not Found", 400: "400 Bad Request"}
+
+
+def parse_latency(spec):
+    # returns a function drawing one latency in seconds
+    name, *values = spec.split(":")
+    values = [float(value) for value in values]
+    if name == "const" and len(values) == 1:
+        return lambda: values[0] / 1000
+    if name == "uniform" and len(values) == 2:
+        return lambda: random.uniform(*values) / 1000
+    if name == "exp" and len(values) == 1 and values[0] > 0:
+        return lambda: random.expovariate(1000 / values[0])
+    if name == "lognormal" and len(values) == 2:
+        median, sigma = values
+        return lambda: median / 1000 * random.lognormvariate(0, sigma)
+    raise ValueError(f"Unknown latency distribution '{spec}', expected const:MS, uniform:LOW:HIGH, exp:MEAN "
+                     f"or lognormal:MEDIAN:SIGMA")
+
+
+def endpoint_kind(endpoint):
+    if endpoint.path.endswith("/welcome"):
+        return "welcome"
+    if endpoint.method != "GET":
+        return "write"
+    return "item" if endpoint.params is not None else "list"
+
+
+def response_body(endpoint, size):
+    # the train-ticket envelope; list endpoints pad their data with records up to the size
+    if endpoint_kind(endpoint) == "welcome":
+        return f"Welcome to [ {endpoint.service} ] !".encode()
+    record = {"id": "9bb0ac3e-b305-4929-84a9-2dfac9de3471", "name": endpoint.service, "value": "x" * 64}
+    data = [] if endpoint_kind(endpoint) == "list" else record
+    body = {"status": 1, "msg": "Success", "data": data}
+    while endpoint_kind(endpoint) == "list" and len(json.dumps(body)) < size:
+        data.append(record)
+    return json.dumps(body, separators=(",", ":")).encode()
+
+
+class Route:
+
+    def __init__(self, endpoint, latency, size):
+        self.endpoint = endpoint
+        self.pattern = re.compile(re.sub(r"\\{\w+\\}", "[^/]+", re.escape(endpoint.path)) + "$")
+        self.latency = latency
+        self.body = response_body(endpoint, size)
+
+
+def build_routes(services, latency, config):
+    routes = []
+    for endpoint in ENDPOINTS:
+        if endpoint.service not in services:
+            continue
+        override = config.get(endpoint.service, {})
+        routes.append(Route(endpoint, parse_latency(override.get("latency", latency)),
+                            override.get("size", SIZES[endpoint_kind(endpoint)])))
+    return routes
+
+
+def response(status, body):
+    return (f"HTTP/1.1 {STATUS_LINES[status]}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+
+
+class UnitServer:
+
+    def __init__(self, name, unit, routes):
+        self.name = name
+        self.unit = unit
+        self.routes = routes
+        self.requests = 0
+        self.latency_total = 0.0
+
+    def route(self, method, path):
+        for route in self.routes:
+            if route.endpoint.method == method and route.pattern.match(path):
+                return route
+        return None
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method, target, _ = request_line.split(" ", 2)
+                length = 0
+                for line in header_lines:
+                    if line.lower().startswith("content-length:"):
+                        length = int(line.split(":", 1)[1])
+                if length:
+                    await reader.readexactly(length)
+                route = self.route(method, target.split("?", 1)[0])
+                if route is None:
+                    writer.write(response(404, b'{"status":0,"msg":"Not Found","data":null}'))
+                else:
+                    delay = route.latency()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    self.requests += 1
+                    self.latency_total += delay
+                    writer.write(response(200, route.body))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def summary(self):
+        mean = self.latency_total / self.requests * 1000 if self.requests else 0.0
+        return f"{self.name:<16} :{self.unit.port:<6} {self.requests:>9} requests, latency mean {mean:.2f} ms"
+
+
+async def report(servers, interval):
+    while True:
+        await asyncio.sleep(interval)
+        print(f"{sum(server.requests for server in servers)} requests", flush=True)
+
+
+async def serve(architecture, latency, config, interval):
+    # stop on Ctrl-C and on kill, also when started in the background where SIGINT is ignored
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        asyncio.get_running_loop().add_signal_handler(signum, asyncio.current_task().cancel)
+    servers = []
+    for name, unit in TOPOLOGY[architecture].items():
+        server = UnitServer(name, unit, build_routes(set(unit.services), latency, config))
+        try:
+            await asyncio.start_server(server.handle, unit.host, unit.port, reuse_address=True)
+        except OSError as error:
+            sys.exit(f"Cannot listen on {unit.host}:{unit.port} for unit '{name}': {error.strerror}")
+        servers.append(server)
+        print(f"{name} listening on {unit.host}:{unit.port} ({len(server.routes)} endpoints)", flush=True)
+    try:
+        await report(servers, interval)
+    finally:
+        for server in servers:
+            print(server.summary(), flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--arch", choices=list(TOPOLOGY), required=True, help="Architecture whose units to emulate")
+    parser.add_argument("--latency", default="const:0", help="Default latency distribution (ms)")
+    parser.add_argument("--config", help="JSON file with per-service latency and size overrides")
+    parser.add_argument("--report", type=float, default=10.0, help="Seconds between progress lines")
+    args = parser.parse_args()
+
+    parse_latency(args.latency)
+    config = {}
+    if args.config:
+        with open(args.config) as config_file:
+            config = json.load(config_file)
+    try:
+        asyncio.run(serve(args.arch, args.latency, config, args.report))
+    except asyncio.CancelledError:
+        pass
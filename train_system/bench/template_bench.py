@@ -0,0 +1,79 @@
+# Benchmark: generator CPU per request with and without compiled request templates
+# For every catalog endpoint with a body or path params, the request is prepared --repeat times the
+# old way (path formatted and payload JSON-encoded on every request) and from its RequestTemplate.
+# "encode" is the work of the fast engine, which serializes json= itself; "requests" adds the
+# PreparedRequest that the requests engine builds for every request. No request is sent.
+# Usage: python bench/template_bench.py --repeat 5000 --rounds 5
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from loadgen.catalog import ENDPOINTS
+from loadgen.templates import RequestTemplate
+# after locust, which monkey-patches ssl on import
+import requests
+
+HOST = "http://localhost:12345"
+
+
+def per_request(endpoint):
+    path = endpoint.path if endpoint.params is None else endpoint.path.format(**endpoint.params())
+    payload = endpoint.payload() if callable(endpoint.payload) else endpoint.payload
+    return path, {} if payload is None else {"json": payload}
+
+
+def encode_per_request(endpoint):
+    path, arguments = per_request(endpoint)
+    if "json" in arguments:
+        json.dumps(arguments["json"]).encode()
+    return path
+
+
+def encode_template(template):
+    return template.render()[0]
+
+
+def prepare_per_request(endpoint):
+    path, arguments = per_request(endpoint)
+    return requests.Request(endpoint.method, HOST + path, **arguments).prepare()
+
+
+def prepare_template(template):
+    path, arguments = template.render()
+    return requests.Request(template.method, HOST + path, **arguments).prepare()
+
+
+def measure(function, argument, repeat, rounds):
+    # best of several rounds, the other processes on the machine only ever add time
+    best = None
+    for _ in range(rounds):
+        start = time.process_time()
+        for _ in range(repeat):
+            function(argument)
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / repeat * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5000, help="Requests prepared per round")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per endpoint and variant, the best counts")
+    args = parser.parse_args()
+
+    print(f"CPU us per request, best of {args.rounds} rounds of {args.repeat} requests")
+    print(f"{'endpoint':<22} {'encode old':>10} {'template':>9} {'requests old':>13} {'template':>9} {'saved':>6}")
+    for endpoint in ENDPOINTS:
+        if endpoint.payload is None and endpoint.params is None:
+            continue
+        template = RequestTemplate(endpoint)
+        encode_old = measure(encode_per_request, endpoint, args.repeat, args.rounds)
+        encode_new = measure(encode_template, template, args.repeat, args.rounds)
+        prepare_old = measure(prepare_per_request, endpoint, args.repeat, args.rounds)
+        prepare_new = measure(prepare_template, template, args.repeat, args.rounds)
+        saved = (1 - prepare_new / prepare_old) * 100 if prepare_old else 0.0
+        print(f"{endpoint.service:<22} {encode_old:>10.2f} {encode_new:>9.2f} {prepare_old:>13.2f} "
+              f"{prepare_new:>9.2f} {saved:>5.1f}%")
@@ -0,0 +1,284 @@
+# Campaign runner for the profile scripts (replaces the fixed sleeps of auto_coarse.sh/auto_med.sh/auto_low.sh)
+# Runs every selected profile of one architecture for a number of iterations. Between two runs it
+# probes the services of the architecture and starts the next run as soon as all of them answer
+# without errors and their latency is back to the idle baseline measured before the campaign.
+# The wait is bounded by --max-wait (the old delay, plus reset_time after bursts) and the actual
+# wait of every iteration is appended to results/<arch>/campaign_waits.csv.
+# The services are probed on an allow-list of idempotent reads, never on endpoints with side effects.
+# --arrival picks closed or open-loop injection for all profiles (poisson) or per profile (burst_high=poisson).
+# --profiles defaults to the three even profiles the old shell loops ran.
+# Usage: python campaign.py --arch coarse [--profiles even_high even_med] [--iterations 10]
+import argparse
+import csv
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from loadgen.catalog import PROFILES, selected_services
+from loadgen.engine import ENGINES
+from loadgen.histogram import DIGITS, WINDOW
+from loadgen.openloop import ARRIVALS, MAX_INFLIGHT
+from loadgen.payloads import PAYLOAD_MODES
+from loadgen.saturation import SATURATION_CPU, SATURATION_LAG
+from loadgen.launcher import RESULTS_DIRS, check_topology, distribution, fixture_file
+from loadgen.sink import SINK_MODES
+from loadgen.topology import base_url, service_units
+
+SCRIPT_DIRS = {
+    "coarse": "coarse_script",
+    "medium": "medium_script",
+    "fine": "fine_script",
+}
+# the profiles the old shell loops ran, the burst loops were commented out
+DEFAULT_PROFILES = ["even_high", "even_med", "even_low"]
+# read-only endpoints without side effects the readiness probe may call, per service
+# (not NotificationService, whose only parameterless GET sends a test message)
+PROBE_PATHS = {
+    "PriceService": "/api/v1/priceservice/prices",
+    "TrainFoodService": "/api/v1/trainfoodservice/trainfoods",
+    "TrainService": "/api/v1/trainservice/trains",
+    "RouteService": "/api/v1/routeservice/routes",
+    "ContactsService": "/api/v1/contactservice/contacts",
+    "AdminBasicInfoService": "/api/v1/adminbasicservice/adminbasic/contacts",
+    "AdminOrderService": "/api/v1/adminorderservice/adminorder",
+    "OrderService": "/api/v1/orderservice/order",
+    "OrderOtherService": "/api/v1/orderOtherService/orderOther",
+    "SeatService": "/api/v1/seatservice/welcome",
+    "Travel2Service": "/api/v1/travel2service/trips",
+    "AdminTravelService": "/api/v1/admintravelservice/admintravel",
+    "AdminRouteService": "/api/v1/adminrouteservice/adminroute",
+    "AdminUserService": "/api/v1/adminuserservice/users",
+    "AssuranceService": "/api/v1/assuranceservice/assurances",
+    "ConfigService": "/api/v1/configservice/configs",
+    "SecurityService": "/api/v1/securityservice/securityConfigs",
+    "CancelService": "/api/v1/cancelservice/welcome",
+    "ExecuteService": "/api/v1/executeservice/welcome",
+    "FoodDeliverService": "/api/v1/fooddeliveryservice/orders/all",
+    "FoodService": "/api/v1/foodservice/orders",
+    "InsidePaymentService": "/api/v1/inside_pay_service/inside_payment/account",
+    "PaymentService": "/api/v1/paymentservice/payment",
+    "PreserveService": "/api/v1/preserveservice/welcome",
+    "RebookService": "/api/v1/rebookservice/welcome",
+    "WaitOrderService": "/api/v1/waitorderservice/orders",
+    "PreserveOtherService": "/api/v1/preserveotherservice/welcome",
+}
+WAITS_HEADER = ["started", "architecture", "profile", "iteration", "exit_code", "run_s", "wait_s", "ready",
+                "probe_rounds", "probe_latency_ms", "probe_errors"]
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def probe_targets(architecture, services=None):
+    # the allow-listed paths served by the deployment units of the selected services
+    units = service_units(architecture)
+    selected = {units[service] for service in selected_services(services)}
+    targets = []
+    for service, path in PROBE_PATHS.items():
+        url = f"{base_url(architecture, service)}{path}"
+        if units[service] in selected and url not in targets:
+            targets.append(url)
+    return targets
+
+
+def probe_once(url, timeout):
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+            ok = response.status < 500
+    except urllib.error.HTTPError as error:
+        ok = error.code < 500
+    except (urllib.error.URLError, OSError):
+        ok = False
+    return ok, (time.perf_counter() - start) * 1000
+
+
+class ReadinessProbe:
+
+    def __init__(self, targets, timeout=2.0, tolerance=1.5, slack_ms=5.0, workers=16):
+        self.targets = targets
+        self.timeout = timeout
+        self.tolerance = tolerance
+        self.slack_ms = slack_ms
+        self.baseline_ms = None
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+
+    def sample(self):
+        # returns (median latency in ms over the successful probes, number of failed probes)
+        results = list(self._pool.map(lambda url: probe_once(url, self.timeout), self.targets))
+        latencies = [latency for ok, latency in results if ok]
+        errors = sum(1 for ok, _ in results if not ok)
+        return (statistics.median(latencies) if latencies else None), errors
+
+    def measure_baseline(self, rounds=5):
+        samples = []
+        for _ in range(rounds):
+            latency, errors = self.sample()
+            if latency is not None and errors == 0:
+                samples.append(latency)
+        self.baseline_ms = statistics.median(samples) if samples else None
+        return self.baseline_ms
+
+    def is_ready(self, latency, errors):
+        if errors or latency is None:
+            return False
+        if self.baseline_ms is None:
+            return True
+        return latency <= self.baseline_ms * self.tolerance + self.slack_ms
+
+    def wait_until_ready(self, max_wait, min_wait=0.0, interval=1.0, consecutive=2):
+        # the services count as recovered after `consecutive` ready rounds in a row
+        start = time.perf_counter()
+        rounds, streak = 0, 0
+        latency, errors = None, 0
+        time.sleep(min_wait)
+        while True:
+            latency, errors = self.sample()
+            rounds += 1
+            streak = streak + 1 if self.is_ready(latency, errors) else 0
+            waited = time.perf_counter() - start
+            if streak >= consecutive:
+                return waited, True, rounds, latency, errors
+            if waited + interval >= max_wait:
+                time.sleep(max(0.0, max_wait - waited))
+                return time.perf_counter() - start, False, rounds, latency, errors
+            time.sleep(interval)
+
+
+def parse_arrivals(items):
+    # ["poisson"] applies to every profile, ["burst_high=poisson", ...] to single profiles
+    arrivals = {}
+    for item in items:
+        profile, _, mode = item.rpartition("=")
+        if mode not in ARRIVALS or (profile and profile not in PROFILES):
+            raise argparse.ArgumentTypeError(f"Invalid --arrival '{item}'")
+        arrivals[profile or None] = mode
+    return arrivals
+
+
+def run_profile_script(architecture, profile, args, iteration):
+    script = os.path.join(base_dir, SCRIPT_DIRS[architecture], f"{profile}.py")
+    run_time = args.runtime_burst if profile.startswith("burst") else args.runtime_even
+    arrival = args.arrivals.get(profile, args.arrivals.get(None, "closed"))
+    print(f"Running {architecture}/{profile} iteration {iteration}: pacing={PROFILES[profile].pacing}, "
+          f"users={args.users}, rate={args.rate}, runtime={run_time}, arrival={arrival}")
+    command = [
+        sys.executable, script,
+        "-u", str(args.users),
+        "-r", str(args.rate),
+        "--run-time", run_time,
+        "--iteration", str(iteration),
+        "--engine", args.engine,
+        "--request-log", args.request_log,
+        "--arrival", arrival,
+        "--workers", str(args.workers),
+        "--pool-size", str(args.pool_size),
+        "--payload-pool", str(args.payload_pool),
+        "--payload-mode", args.payload_mode,
+        "--payload-seed", args.payload_seed,
+        "--key-distribution", args.key_distribution,
+        "--max-inflight", str(args.max_inflight),
+        "--histogram-window", str(args.histogram_window),
+        "--histogram-digits", str(args.histogram_digits),
+        "--saturation-cpu", str(args.saturation_cpu),
+        "--saturation-lag", str(args.saturation_lag),
+        *(["--services", *args.services] if args.services else []),
+        *(["--fixtures", os.path.abspath(args.fixtures)] if args.fixtures else []),
+        # checked once for the whole campaign
+        "--skip-preflight",
+    ]
+    return subprocess.call(command, cwd=base_dir)
+
+
+def append_wait(path, row):
+    new_file = not os.path.exists(path)
+    with open(path, "a", newline="") as waits_file:
+        writer = csv.writer(waits_file)
+        if new_file:
+            writer.writerow(WAITS_HEADER)
+        writer.writerow(row)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--arch", choices=list(SCRIPT_DIRS), required=True, help="Architecture under test")
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=DEFAULT_PROFILES)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("-u", "--users", type=int, default=80, help="Number of users")
+    parser.add_argument("-r", "--rate", type=int, default=40, help="Spawn rate")
+    parser.add_argument("--runtime-burst", default="10s")
+    parser.add_argument("--runtime-even", default="120s")
+    parser.add_argument("--delay", type=float, default=30, help="Upper bound of the wait between iterations (s)")
+    parser.add_argument("--reset-time", type=float, default=110, help="Extra upper bound after burst runs (s)")
+    parser.add_argument("--min-wait", type=float, default=2, help="Wait at least this long after a run (s)")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="Ready when latency <= baseline * tolerance")
+    parser.add_argument("--engine", choices=list(ENGINES), default="requests", help="Locust HTTP client")
+    parser.add_argument("--request-log", choices=SINK_MODES, default="buffered")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes per run (0: single process)")
+    parser.add_argument("--pool-size", type=int, default=0, help="Shared connections per deployment unit")
+    parser.add_argument("--payload-pool", type=int, default=0, help="Unique payloads per write endpoint")
+    parser.add_argument("--payload-mode", choices=PAYLOAD_MODES, default="round-robin")
+    parser.add_argument("--payload-seed", default="0", help="Seed of the payload pools and fixture sampling")
+    parser.add_argument("--fixtures", type=fixture_file, help="ID fixture file (see loadgen/fixtures.py)")
+    parser.add_argument("--key-distribution", type=distribution, default="uniform",
+                        help="uniform, zipf:S or hot:H:P")
+    parser.add_argument("--skip-preflight", action="store_true", help="Start even if a unit is not listening")
+    parser.add_argument("--services", nargs="+", help="Only run these service users (default: all)")
+    parser.add_argument("--max-inflight", type=int, default=MAX_INFLIGHT, help="Open-loop bound on requests")
+    parser.add_argument("--histogram-digits", type=int, choices=range(1, 6), default=DIGITS)
+    parser.add_argument("--histogram-window", type=float, default=WINDOW, help="Seconds per histogram window")
+    parser.add_argument("--saturation-cpu", type=float, default=SATURATION_CPU, help="Saturated above this CPU %%")
+    parser.add_argument("--saturation-lag", type=float, default=SATURATION_LAG, help="Saturated above this lag (ms)")
+    parser.add_argument("--arrival", nargs="+", default=["closed"],
+                        help=f"{'|'.join(ARRIVALS)} for all profiles, or profile=mode per profile")
+    args = parser.parse_args()
+    try:
+        args.arrivals = parse_arrivals(args.arrival)
+    except argparse.ArgumentTypeError as error:
+        parser.error(str(error))
+
+    try:
+        selected_services(args.services)
+    except ValueError as error:
+        parser.error(str(error))
+
+    check_topology(args.arch, args.services, skip=args.skip_preflight)
+
+    results_dir = os.path.join(base_dir, RESULTS_DIRS[args.arch])
+    os.makedirs(results_dir, exist_ok=True)
+    waits_path = os.path.join(results_dir, "campaign_waits.csv")
+
+    probe = ReadinessProbe(probe_targets(args.arch, args.services), tolerance=args.tolerance)
+    baseline = probe.measure_baseline()
+    if not probe.targets:
+        print("No probe path on the selected units, waiting the full delay between iterations")
+    print(f"Idle probe baseline: {f'{baseline:.1f} ms' if baseline is not None else 'unavailable'} "
+          f"over {len(probe.targets)} endpoints")
+
+    campaign_start = time.perf_counter()
+    for profile in args.profiles:
+        print(f"{profile} groups begins...")
+        for iteration in range(1, args.iterations + 1):
+            started = datetime.now().isoformat(timespec="seconds")
+            run_start = time.perf_counter()
+            exit_code = run_profile_script(args.arch, profile, args, iteration)
+            run_seconds = time.perf_counter() - run_start
+
+            last_run = profile == args.profiles[-1] and iteration == args.iterations
+            if last_run:
+                waited, ready, rounds, latency, errors = 0.0, True, 0, None, 0
+            else:
+                max_wait = args.delay + (args.reset_time if profile.startswith("burst") else 0)
+                waited, ready, rounds, latency, errors = probe.wait_until_ready(max_wait, args.min_wait)
+                print(f"Waited {waited:.1f}s of at most {max_wait:.0f}s ({'ready' if ready else 'timed out'})")
+            append_wait(waits_path, [started, args.arch, profile, iteration, exit_code, round(run_seconds, 1),
+                                     round(waited, 1), ready, rounds,
+                                     round(latency, 1) if latency is not None else "", errors])
+
+    print(f"All iterations completed in {(time.perf_counter() - campaign_start) / 60:.1f} min.")
@@ -0,0 +1 @@
+# Shared building blocks for the train-ticketing load test scripts
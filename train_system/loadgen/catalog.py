@@ -0,0 +1,158 @@
+# Declarative catalog of the train-ticketing endpoints exercised by the load tests
+# Every service user of the coarse, medium and fine-grained test scripts is described once in endpoints.py
+# (endpoint, method, payload factory; the addresses come from topology.py). build_users() generates the
+# TaskSet/HttpUser classes for one architecture and profile at import time. The pacing and request
+# limits are read from an ActiveProfile, which a load shape can switch while the test runs.
+# With LOADGEN_ARRIVAL=poisson|deterministic the users inject requests open-loop (see openloop.py).
+import logging
+import os
+import time
+
+from locust import TaskSet, constant, events
+from locust.runners import MasterRunner
+
+from loadgen.engine import engine_name, user_base
+# the table is re-exported, catalog stays the import point of the scripts
+from loadgen.endpoints import ENDPOINTS, PROFILES, Endpoint, Keys, Profile
+from loadgen.fixtures import Fixtures, fixture_settings
+from loadgen.lease import install_quota_leases
+from loadgen.openloop import InFlight, arrival_mode, make_injector, max_inflight
+from loadgen.pacing import PacingRecorder
+from loadgen.payloads import PayloadPools, payload_settings
+from loadgen.pools import SharedPools, pool_size
+from loadgen.quota import LeaseTimeout, TaskQuota
+from loadgen.saturation import install_saturation_monitor
+from loadgen.templates import RequestTemplate
+from loadgen.topology import base_url
+
+SERVICES_ENV = "LOADGEN_SERVICES"
+
+logger = logging.getLogger('locust')
+
+
+class ActiveProfile:
+    # the profile the generated users run with; activate() switches pacing and starts fresh quotas
+
+    def __init__(self, profile):
+        self.name = None
+        self.finished = 0
+        self.generation = -1
+        # distributed workers swap in leased quotas, the master listens for switches (see lease.py)
+        self.quota_factory = lambda name, limits: TaskQuota(limits)
+        self.listeners = []
+        self.activate(profile)
+
+    def activate(self, profile, generation=None):
+        if self.name is not None:
+            self.finished += self.total()
+        limit, self.pacing = PROFILES[profile]
+        self.name = profile
+        self.generation = self.generation + 1 if generation is None else generation
+        self.quotas = {
+            "full": self.quota_factory(
+                "full", {endpoint.key: limit for endpoint in ENDPOINTS if endpoint.quota == "full"}),
+            "half": self.quota_factory(
+                "half", {endpoint.key: limit / 2 for endpoint in ENDPOINTS if endpoint.quota == "half"}),
+        }
+        for listener in self.listeners:
+            listener(self)
+
+    def reserve(self, endpoint):
+        return self.quotas[endpoint.quota].reserve(endpoint.key)
+
+    def total(self):
+        return sum(quota.total() for quota in self.quotas.values())
+
+    def wait_time(self):
+        # locust's constant_pacing, with the pacing looked up on every wait
+        active = self
+
+        def wait_time_func(user):
+            now = time.perf_counter()
+            run_time = now - user._cp_last_run - user._cp_last_wait_time
+            user._cp_last_wait_time = max(0, active.pacing - run_time)
+            user._cp_last_run = now
+            # the next task is due one pacing after the previous one was due, however late that ran
+            user.intended = getattr(user, "intended", now - run_time) + active.pacing
+            return user._cp_last_wait_time
+
+        return wait_time_func
+
+
+def make_request(endpoint, active):
+    template = RequestTemplate(endpoint)
+
+    def request(self, intended=None):
+        try:
+            reserved = active.reserve(endpoint)
+        except LeaseTimeout as error:
+            logger.error(f"Skipping task, {error}")
+            return
+        if reserved:
+            template.send(self.client, intended)
+        else:
+            logger.info("Request limit reached, skipping task")
+
+    return request
+
+
+def make_task_set(endpoint, active, pacing=None):
+    request = make_request(endpoint, active)
+
+    def paced(self):
+        if pacing is not None:
+            pacing.record(self.user, endpoint.service, active)
+        request(self, getattr(self.user, "intended", None))
+
+    return type(f"{endpoint.service}Task", (TaskSet,), {"tasks": [paced]})
+
+
+def selected_services(services=None):
+    if services is None:
+        services = os.environ.get(SERVICES_ENV)
+        services = services.split(",") if services else None
+    if services is None:
+        return [endpoint.service for endpoint in ENDPOINTS]
+    known = {endpoint.service for endpoint in ENDPOINTS}
+    unknown = set(services) - known
+    if unknown:
+        raise ValueError(f"Unknown services: {', '.join(sorted(unknown))}")
+    return list(services)
+
+
+def build_users(architecture, profile, services=None):
+    # profile is a profile name or an ActiveProfile shared with a load shape
+    active = profile if isinstance(profile, ActiveProfile) else ActiveProfile(profile)
+    base = user_base()
+    wanted = set(selected_services(services))
+    mode = arrival_mode()
+    inflight = InFlight(max_inflight()).install(events) if mode != "closed" else None
+    install_quota_leases(events, active)
+    pools = SharedPools(architecture, pool_size(), engine_name()).install(events)
+    payloads = PayloadPools(*payload_settings()).install(events)
+    fixtures = Fixtures(*fixture_settings()).install(events)
+    install_saturation_monitor(events, inflight)
+    pacing = PacingRecorder().install(events) if inflight is None else None
+
+    users = {}
+    for endpoint in ENDPOINTS:
+        if endpoint.service not in wanted:
+            continue
+        endpoint = fixtures.bind(payloads.bind(endpoint))
+        if inflight is None:
+            behaviour = {"tasks": [make_task_set(endpoint, active, pacing)], "wait_time": active.wait_time()}
+        else:
+            injector = make_injector(endpoint.service, make_request(endpoint, active), active, mode, inflight)
+            behaviour = {"tasks": [injector], "wait_time": constant(0)}
+        users[endpoint.service] = type(endpoint.service, (base,), {
+            **behaviour,
+            "host": base_url(architecture, endpoint.service),
+            **pools.attributes(endpoint.service),
+        })
+
+    @events.quitting.add_listener
+    def _(environment, **kwargs):
+        if not isinstance(environment.runner, MasterRunner):
+            logger.info(f"Total requests: {active.finished + active.total()}")
+
+    return users
@@ -0,0 +1,105 @@
+# Local master/worker launch for the profile scripts (--workers N)
+# One locust process is bound to a single core, so the high profiles can be generator-limited. With
+# --workers N the launcher starts a headless master and N workers on this machine, each pinned to its
+# own core where the platform allows it, and waits for all of them. The processes log into a scratch
+# directory next to the run's log; afterwards their logs are merged in timestamp order into the usual
+# results/<arch>/locustfile_..._{iteration}.log and their latency histograms into the usual
+# .hdr.json.gz (and their pacing histograms and saturation flags), so the wash and stats scripts see one
+# run as before. The master aggregates the stats of the workers, so the csv reports are written once,
+# by the master, next to the run's log as <log name>_stats.csv and so on.
+import glob
+import heapq
+import os
+import shutil
+import socket
+import subprocess
+import sys
+
+from loadgen.histogram import histogram_path, log_stem, merge_dump_files
+from loadgen.pacing import merge_pacing_files, pacing_path
+from loadgen.saturation import merge_saturation
+
+EXPECT_WORKERS_WAIT = 60
+# tells a worker its index, e.g. to derive its own payload seed
+WORKER_INDEX_ENV = "LOADGEN_WORKER_INDEX"
+
+
+def available_cores():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def pin_to(core):
+    if not hasattr(os, "sched_setaffinity"):
+        return None
+    return lambda: os.sched_setaffinity(0, {core})
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def log_entries(path):
+    # a log entry is a timestamped line plus any continuation lines (tracebacks, stats tables)
+    with open(path, errors="replace") as log_file:
+        entry, key = [], ""
+        for line in log_file:
+            if line.startswith("[") and entry:
+                yield key, "".join(entry)
+                entry = []
+            if not entry:
+                key = line[:25] if line.startswith("[") else key
+            entry.append(line)
+        if entry:
+            yield key, "".join(entry)
+
+
+def merge_logs(paths, output_path):
+    with open(output_path, "a") as output:
+        for _, entry in heapq.merge(*(log_entries(path) for path in paths), key=lambda item: item[0]):
+            output.write(entry)
+
+
+def run_distributed(locustfile, logfile, options, env, workers):
+    scratch = os.path.splitext(logfile)[0] + ".workers"
+    os.makedirs(scratch, exist_ok=True)
+    cores = available_cores()
+    port = str(free_port())
+    base = [sys.executable, "-m", "locust", "-f", locustfile]
+
+    master = subprocess.Popen(base + [
+        "--master", "--headless",
+        "--master-bind-port", port,
+        "--expect-workers", str(workers),
+        "--expect-workers-max-wait", str(EXPECT_WORKERS_WAIT),
+        *options,
+        f"--csv={log_stem(logfile)}",
+        f"--logfile={scratch}/master.log",
+    ], env=env, preexec_fn=pin_to(cores[0]))
+    worker_cores = cores[1:] or cores
+    processes = [subprocess.Popen(base + [
+        "--worker",
+        "--master-host", "127.0.0.1",
+        "--master-port", port,
+        f"--logfile={scratch}/worker{index}.log",
+    ], env={**env, WORKER_INDEX_ENV: str(index)},
+        preexec_fn=pin_to(worker_cores[index % len(worker_cores)])) for index in range(workers)]
+
+    exit_code = master.wait()
+    # a worker that failed its part of the run (e.g. an exhausted payload pool) fails the run
+    worker_codes = [process.wait() for process in processes]
+    exit_code = exit_code or next((code for code in worker_codes if code), 0)
+
+    merge_logs(sorted(glob.glob(os.path.join(scratch, "*.log"))), logfile)
+    dumps = sorted(glob.glob(os.path.join(scratch, "worker*.hdr.json.gz")))
+    if dumps:
+        merge_dump_files(dumps, histogram_path(logfile))
+    pacing_dumps = sorted(glob.glob(os.path.join(scratch, "worker*.pacing.json")))
+    if pacing_dumps:
+        merge_pacing_files(pacing_dumps, pacing_path(logfile))
+    merge_saturation([os.path.join(scratch, f"worker{index}.log") for index in range(workers)], logfile)
+    shutil.rmtree(scratch)
+    return exit_code
@@ -0,0 +1,129 @@
+# Endpoint table of the train-ticketing services, shared by the load generator and the stand-in server
+# Only the standard library is imported here, so tools that must not pull in locust (and gevent's
+# monkey-patching with it, like bench/standin_server.py) can read the table. catalog.py builds the
+# locust users from it and re-exports every name.
+import random
+from collections import namedtuple
+
+
+class Keys:
+    # params of an endpoint whose path holds fixture IDs; called unbound it returns the hardcoded ones
+
+    def __init__(self, **defaults):
+        self.defaults = defaults
+
+    def __call__(self):
+        return self.defaults
+
+
+# limit = requests per service, pacing = seconds between two tasks of one user
+Profile = namedtuple("Profile", "limit pacing")
+PROFILES = {
+    "burst_high": Profile(200, 0.01),
+    "burst_med": Profile(20, 0.4),
+    "burst_low": Profile(2, 5),
+    "even_high": Profile(200, 0.5),
+    "even_med": Profile(20, 6),
+    "even_low": Profile(2, 60),
+}
+
+# key = quota slot in task_limits (or half_task_limits when quota is "half")
+# path may contain {fields} that are filled from params() on every request; Keys params hold fixture IDs
+# that are sampled from a pool when one is loaded (see fixtures.py)
+# payload is sent as JSON; it is either a static value, serialized once (see templates.py), or a factory
+# called per request with a random source (the module, or a seeded random.Random when pooled, see
+# payloads.py)
+Endpoint = namedtuple("Endpoint", "service key method path params payload quota")
+Endpoint.__new__.__defaults__ = (None, None, "full")
+
+
+def station_payload(rng=random):
+    name = ''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=6))
+    return {
+        "id": "string",
+        "name": name,
+        "stayTime": 2
+    }
+
+
+def user_payload(rng=random):
+    password = ''.join(rng.choices('abcdefghijklmnopqrstuvwxyz123456', k=7))
+    return {
+        "documentNum": "2135488099312X",
+        "documentType": 1,
+        "email": "trainticket_notify@163.com",
+        "gender": 1,
+        "password": password,
+        "userId": "4d2a46c7-71cb-4cf1-b5bb-b68406d9da6f",
+        "userName": "fdse_microservice"
+    }
+
+
+def basic_city():
+    return {"city": random.choice(["beijing", "shanghai", "xuzhou", "hangzhou"])}
+
+
+ENDPOINTS = [
+    Endpoint("StationService", "task_1", "POST", "/api/v1/stationservice/stations", payload=station_payload),
+    Endpoint("PriceService", "task_2", "GET", "/api/v1/priceservice/prices"),
+    Endpoint("TrainFoodService", "task_3", "GET", "/api/v1/trainfoodservice/trainfoods"),
+    Endpoint("TrainService", "task_4", "GET", "/api/v1/trainservice/trains"),
+    Endpoint("RouteService", "task_5", "GET", "/api/v1/routeservice/routes"),
+    Endpoint("ContactsService", "task_6", "GET", "/api/v1/contactservice/contacts"),
+    Endpoint("AdminBasicInfoService", "task_7", "GET", "/api/v1/adminbasicservice/adminbasic/contacts"),
+    # task_8 (/api/v1/adminbasicservice/adminbasic/stations) is disabled in the experiments
+    Endpoint("AdminBasicInfoService3", "task_9", "GET", "/api/v1/adminbasicservice/adminbasic/prices"),
+    Endpoint("AdminOrderService", "task_10", "GET", "/api/v1/adminorderservice/adminorder"),
+    Endpoint("BasicService", "task_11", "GET", "/api/v1/basicservice/basic/{city}", params=basic_city),
+    Endpoint("OrderService", "task_12", "GET", "/api/v1/orderservice/order"),
+    Endpoint("OrderService2", "task_13", "GET", "/api/v1/orderservice/order/{orderId}",
+             params=Keys(orderId="9bb0ac3e-b305-4929-84a9-2dfac9de3471")),
+    Endpoint("OrderOtherService", "task_14", "GET", "/api/v1/orderOtherService/orderOther"),
+    Endpoint("SeatService", "task_15", "GET", "/api/v1/seatservice/welcome"),
+    Endpoint("StationFoodService", "task_16", "GET", "/api/v1/stationfoodservice/stationfoodstores",
+             payload=["beijing", "shanghai", "nanjing", "hangzhou"]),
+    Endpoint("Travel2Service", "task_17", "GET", "/api/v1/travel2service/trips"),
+    Endpoint("UserService", "task_18", "PUT", "/api/v1/userservice/users", payload=user_payload),
+    Endpoint("AdminTravelService", "task_1", "GET", "/api/v1/admintravelservice/admintravel", quota="half"),
+    Endpoint("AdminTravelService2", "task_2", "GET", "/api/v1/admintravelservice/admintravel", quota="half"),
+    Endpoint("AdminRouteService", "task_20", "GET", "/api/v1/adminrouteservice/adminroute"),
+    Endpoint("AdminUserService", "task_21", "GET", "/api/v1/adminuserservice/users"),
+    Endpoint("AssuranceService", "task_22", "GET", "/api/v1/assuranceservice/assurances"),
+    Endpoint("ConfigService", "task_23", "GET", "/api/v1/configservice/configs"),
+    Endpoint("ConsignPriceService", "task_24", "POST", "/api/v1/consignpriceservice/consignprice", payload={
+        "beyondPrice": 1,
+        "id": "99b7ba12-155f-41c2-9a4a-38705c010f0f",
+        "index": 0,
+        "initialPrice": 2,
+        "initialWeight": 1,
+        "withinPrice": 2
+    }),
+    Endpoint("ConsignService", "task_25", "GET", "/api/v1/consignservice/consigns/account/{accountId}",
+             params=Keys(accountId="4d2a46c7-71cb-4cf1-b5bb-b68406d9da6f")),
+    Endpoint("NotificationService", "task_26", "GET", "/api/v1/notifyservice/test_send_mq"),
+    Endpoint("SecurityService", "task_27", "GET", "/api/v1/securityservice/securityConfigs"),
+    Endpoint("TravelService", "task_28", "GET", "/api/v1/travelservice/train_types/{tripId}",
+             params=Keys(tripId="G1234")),
+    Endpoint("CancelService", "task_29", "GET", "/api/v1/cancelservice/welcome"),
+    Endpoint("ExecuteService", "task_30", "GET", "/api/v1/executeservice/welcome"),
+    Endpoint("FoodDeliverService", "task_31", "GET", "/api/v1/fooddeliveryservice/orders/all"),
+    Endpoint("FoodService", "task_32", "GET", "/api/v1/foodservice/orders"),
+    Endpoint("InsidePaymentService", "task_33", "GET", "/api/v1/inside_pay_service/inside_payment/account"),
+    Endpoint("OrderOther2Service", "task_34", "GET", "/api/v1/orderOtherService/orderOther/2013-08-09/1"),
+    Endpoint("PaymentService", "task_35", "GET", "/api/v1/paymentservice/payment"),
+    Endpoint("PreserveService", "task_36", "GET", "/api/v1/preserveservice/welcome"),
+    Endpoint("RebookService", "task_37", "GET", "/api/v1/rebookservice/welcome"),
+    Endpoint("WaitOrderService", "task_38", "GET", "/api/v1/waitorderservice/orders"),
+    Endpoint("TravelPlanService", "task_39", "POST", "/api/v1/travelplanservice/travelPlan/cheapest", payload={
+        "departureTime": "2013-08-12",
+        "endPlace": "shanghai",
+        "startPlace": "nanjing"
+    }),
+    Endpoint("RoutePlanService", "task_40", "POST", "/api/v1/routeplanservice/routePlan/cheapestRoute", payload={
+        "endStation": "shanghai",
+        "num": 0,
+        "startStation": "nanjing",
+        "travelDate": "2013-08-01"
+    }),
+    Endpoint("PreserveOtherService", "task_41", "GET", "/api/v1/preserveotherservice/welcome"),
+]
@@ -0,0 +1,25 @@
+# Selects the Locust user class that the service users are built on
+# "requests" is the python-requests based HttpUser, "fast" is the geventhttpclient based
+# FastHttpUser, which costs several times less CPU per request.
+# The launcher passes the choice to the locust process through an environment variable,
+# so the same task bodies run unchanged on either engine.
+import os
+
+from locust import FastHttpUser, HttpUser
+
+ENGINE_ENV = "LOADGEN_ENGINE"
+ENGINES = {
+    "requests": HttpUser,
+    "fast": FastHttpUser,
+}
+
+
+def engine_name():
+    name = os.environ.get(ENGINE_ENV, "requests")
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine '{name}', expected one of: {', '.join(ENGINES)}")
+    return name
+
+
+def user_base():
+    return ENGINES[engine_name()]
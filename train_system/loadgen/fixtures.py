@@ -0,0 +1,197 @@
+# ID fixtures sampled with a configurable key distribution
+# Some endpoints read one entity by ID (an order, a trip, an account). With one hardcoded ID every
+# request hits the same, perfectly hot cache entry. With LOADGEN_FIXTURES=<file> (--fixtures) the IDs
+# are drawn from a pool of real ones instead, per request and with LOADGEN_KEY_DISTRIBUTION
+# (--key-distribution):
+#   uniform        every ID equally often
+#   zipf:S         the ID of rank k with probability proportional to 1 / k^S
+#   hot:H:P        a fraction P of the requests goes to the first H (fraction) of the IDs
+# The file maps a kind (orderId, tripId, accountId) to its IDs in rank order. It is written by the
+# seeding step, which reads the IDs from a running deployment:
+#   python -m loadgen.fixtures --arch coarse --output fixtures/coarse.json
+# Without a file, or for a kind the file lacks, the endpoint keeps its hardcoded ID.
+import argparse
+import bisect
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import urllib.request
+
+from locust.runners import MasterRunner
+
+from loadgen.distributed import WORKER_INDEX_ENV
+from loadgen.endpoints import Keys
+from loadgen.payloads import PAYLOAD_SEED_ENV
+from loadgen.topology import TOPOLOGY, base_url
+
+FIXTURES_ENV = "LOADGEN_FIXTURES"
+DISTRIBUTION_ENV = "LOADGEN_KEY_DISTRIBUTION"
+DISTRIBUTIONS = ("uniform", "zipf", "hot")
+
+logger = logging.getLogger('locust')
+
+
+def parse_distribution(spec):
+    name, *values = spec.split(":")
+    if name not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown key distribution '{spec}', expected uniform, zipf:S or hot:H:P")
+    values = [float(value) for value in values]
+    if name == "zipf" and (len(values) != 1 or values[0] <= 0):
+        raise ValueError(f"Key distribution '{spec}' needs a positive skew, e.g. zipf:1.1")
+    if name == "hot" and (len(values) != 2 or not all(0 < value <= 1 for value in values)):
+        raise ValueError(f"Key distribution '{spec}' needs two fractions, e.g. hot:0.1:0.9")
+    if name == "uniform" and values:
+        raise ValueError(f"Key distribution '{spec}' takes no parameters")
+    return name, values
+
+
+class KeySampler:
+    # greenlets only switch on I/O, so the counters need no lock
+
+    def __init__(self, kind, keys, distribution, seed):
+        self.kind = kind
+        self.keys = keys
+        self.distribution = distribution
+        self.rng = random.Random(f"{seed}:{kind}:{os.environ.get(WORKER_INDEX_ENV, '0')}")
+        self.counts = {}
+        name, values = parse_distribution(distribution)
+        if name == "zipf":
+            weights = (1 / rank ** values[0] for rank in range(1, len(keys) + 1))
+            self.cumulative = list(itertools.accumulate(weights))
+            self.sample = self._zipf
+        elif name == "hot":
+            self.hot = max(1, math.ceil(values[0] * len(keys)))
+            self.hot_share = values[1]
+            self.sample = self._hot
+        else:
+            self.sample = self._uniform
+
+    def _uniform(self):
+        return self.keys[self.rng.randrange(len(self.keys))]
+
+    def _zipf(self):
+        position = bisect.bisect(self.cumulative, self.rng.random() * self.cumulative[-1])
+        return self.keys[min(position, len(self.keys) - 1)]
+
+    def _hot(self):
+        if self.hot >= len(self.keys) or self.rng.random() < self.hot_share:
+            return self.keys[self.rng.randrange(self.hot)]
+        return self.keys[self.rng.randrange(self.hot, len(self.keys))]
+
+    def __call__(self):
+        key = self.sample()
+        self.counts[key] = self.counts.get(key, 0) + 1
+        return key
+
+    def summary(self):
+        samples = sum(self.counts.values())
+        top = max(self.counts.values()) / samples * 100 if samples else 0.0
+        return (f"Fixture {self.kind} ({self.distribution}, {len(self.keys)} keys): {samples} samples, "
+                f"{len(self.counts)} distinct, most frequent key {top:.1f}%")
+
+
+def read_fixtures(path):
+    # kind -> IDs of a fixture file; ValueError when it is not such a JSON object
+    with open(path) as fixture_file:
+        try:
+            fixtures = json.load(fixture_file)
+        except ValueError as error:
+            raise ValueError(f"Fixture file {path} is not valid JSON: {error}") from None
+    if not isinstance(fixtures, dict) or not all(isinstance(keys, list) for keys in fixtures.values()):
+        raise ValueError(f"Fixture file {path} must map each kind to a list of IDs")
+    return {kind: keys for kind, keys in fixtures.items() if keys}
+
+
+def fixture_settings():
+    return (os.environ.get(FIXTURES_ENV) or None, os.environ.get(DISTRIBUTION_ENV, "uniform"),
+            os.environ.get(PAYLOAD_SEED_ENV, "0"))
+
+
+class Fixtures:
+
+    def __init__(self, path, distribution="uniform", seed="0"):
+        parse_distribution(distribution)
+        self.keys = read_fixtures(path) if path else {}
+        self.distribution = distribution
+        self.seed = seed
+        self.samplers = {}
+
+    def sampler(self, kind):
+        if kind not in self.samplers:
+            self.samplers[kind] = KeySampler(kind, self.keys[kind], self.distribution, self.seed)
+        return self.samplers[kind]
+
+    def bind(self, endpoint):
+        # the endpoint with the fixture kinds it has a pool for sampled per request
+        if not isinstance(endpoint.params, Keys):
+            return endpoint
+        sampled = {kind: self.sampler(kind) for kind in endpoint.params.defaults if kind in self.keys}
+        if not sampled:
+            return endpoint
+        defaults = endpoint.params.defaults
+
+        def params():
+            return {kind: sampled[kind]() if kind in sampled else value for kind, value in defaults.items()}
+
+        return endpoint._replace(params=params)
+
+    def install(self, events):
+        @events.quitting.add_listener
+        def _(environment, **kwargs):
+            if isinstance(environment.runner, MasterRunner):
+                return
+            for kind in sorted(self.samplers):
+                logger.info(self.samplers[kind].summary())
+
+        return self
+
+
+# kind -> (service, list path, function returning the ID of one record)
+SOURCES = {
+    "orderId": ("OrderService", "/api/v1/orderservice/order", lambda record: record.get("id")),
+    "accountId": ("OrderService", "/api/v1/orderservice/order", lambda record: record.get("accountId")),
+    "tripId": ("TravelService", "/api/v1/travelservice/trips", lambda record: trip_id(record.get("tripId"))),
+}
+
+
+def trip_id(value):
+    # train-ticket serializes a TripId as {"type": "G", "number": "1234"}
+    if isinstance(value, dict):
+        return f"{value.get('type', '')}{value.get('number', '')}"
+    return value
+
+
+def fetch_keys(architecture, kind, timeout=10.0):
+    service, path, extract = SOURCES[kind]
+    with urllib.request.urlopen(base_url(architecture, service) + path, timeout=timeout) as response:
+        body = json.load(response)
+    if not isinstance(body, dict) or not isinstance(body.get("data") or [], list):
+        raise ValueError(f"{service} {path} did not return a list of records")
+    records = [record for record in body.get("data") or [] if isinstance(record, dict)]
+    # first occurrence wins, so the rank order follows the service's listing
+    keys = dict.fromkeys(key for key in map(extract, records) if key)
+    return list(keys)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--arch", choices=list(TOPOLOGY), required=True)
+    parser.add_argument("--output", required=True, help="Fixture file to write")
+    parser.add_argument("--kinds", nargs="+", choices=list(SOURCES), default=list(SOURCES))
+    args = parser.parse_args()
+
+    fixtures = {}
+    for kind in args.kinds:
+        try:
+            fixtures[kind] = fetch_keys(args.arch, kind)
+        except (OSError, ValueError) as error:
+            # unreachable service, or a response that is not the expected JSON listing
+            print(f"Could not read {kind} from {args.arch}: {error}")
+            continue
+        print(f"{kind}: {len(fixtures[kind])} keys")
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as fixture_file:
+        json.dump(fixtures, fixture_file, indent=2)
@@ -0,0 +1,73 @@
+# HdrHistogram bucket layout and the sparse count encoding shared by every histogram file
+# Values are integers (microseconds in the generator), exact to the configured number of significant
+# digits over the whole range. A histogram is a dict {bucket index: count}; on disk it is the sorted
+# indexes delta-encoded and interleaved with their counts. The generator (histogram.py, pacing.py)
+# writes with this module and data_process/hdr_merge.py reads with it, so the two cannot drift apart.
+# Only the standard library is used, the analysis side does not need locust installed.
+DIGITS = 3
+# percentiles are handled in thousandths of a percent, so nearest ranks are computed in integers
+RANK_SCALE = 100 * 1000
+
+
+class HdrLayout:
+
+    def __init__(self, digits=DIGITS):
+        self.digits = digits
+        # enough sub-buckets to resolve 1 part in 10^digits inside every power of two
+        self.sub_bucket_magnitude = (2 * 10 ** digits - 1).bit_length()
+        self.sub_bucket_half_magnitude = self.sub_bucket_magnitude - 1
+        self.sub_bucket_half_count = 1 << self.sub_bucket_half_magnitude
+        self.sub_bucket_mask = (1 << self.sub_bucket_magnitude) - 1
+
+    def index(self, value):
+        bucket = (value | self.sub_bucket_mask).bit_length() - self.sub_bucket_magnitude
+        sub_bucket = value >> bucket
+        return ((bucket + 1) << self.sub_bucket_half_magnitude) + sub_bucket - self.sub_bucket_half_count
+
+    def value(self, index):
+        # middle of the value range counted in the bucket
+        bucket = (index >> self.sub_bucket_half_magnitude) - 1
+        sub_bucket = (index & (self.sub_bucket_half_count - 1)) + self.sub_bucket_half_count
+        if bucket < 0:
+            sub_bucket -= self.sub_bucket_half_count
+            bucket = 0
+        return (sub_bucket << bucket) + (1 << bucket) // 2
+
+
+def encode(counts):
+    # sorted bucket indexes, delta-encoded and interleaved with their counts
+    flat, previous = [], 0
+    for bucket in sorted(counts):
+        flat += [bucket - previous, counts[bucket]]
+        previous = bucket
+    return flat
+
+
+def decode(flat):
+    counts, bucket = {}, 0
+    for i in range(0, len(flat), 2):
+        bucket += flat[i]
+        counts[bucket] = flat[i + 1]
+    return counts
+
+
+def add_counts(target, counts):
+    for bucket, count in counts.items():
+        target[bucket] = target.get(bucket, 0) + count
+
+
+def percentiles(layout, counts, quantiles):
+    # nearest-rank percentiles followed by the max, in ms from the middle of each bucket; [] when empty
+    total = sum(counts.values())
+    if not total:
+        return []
+    values, seen, position = [], 0, 0
+    buckets = sorted(counts)
+    for q in quantiles:
+        rank = max(1, (round(q * 1000) * total + RANK_SCALE - 1) // RANK_SCALE)
+        while seen + counts[buckets[position]] < rank:
+            seen += counts[buckets[position]]
+            position += 1
+        values.append(layout.value(buckets[position]))
+    values.append(layout.value(buckets[-1]))
+    return [round(value / 1000, 3) for value in values]
@@ -0,0 +1,152 @@
+# High-dynamic-range latency histograms recorded in the generator
+# Every successful request is counted in a histogram per time window and endpoint, using the bucket
+# layout of HdrHistogram (hdr.py): values in microseconds, exact to the configured number of significant
+# digits over the whole range, so a histogram has a fixed number of buckets whatever the load. Buckets
+# are stored sparsely and histograms with the same layout merge losslessly by adding counts, across
+# windows, endpoints and iterations (data_process/hdr_merge.py).
+# When a request carries a schedule lag, response time + lag is also counted in a corrected histogram.
+# At the end of the run all histograms are written next to the log as <log name>.hdr.json.gz; the
+# dumps of distributed workers are merged into one by the launcher.
+import gzip
+import json
+import logging
+import os
+import time
+
+from locust.runners import MasterRunner
+
+from loadgen.hdr import DIGITS, HdrLayout, add_counts, decode, encode
+
+HISTOGRAM_WINDOW_ENV = "LOADGEN_HISTOGRAM_WINDOW"
+HISTOGRAM_DIGITS_ENV = "LOADGEN_HISTOGRAM_DIGITS"
+WINDOW = 1.0
+
+logger = logging.getLogger('locust')
+
+
+class RequestHistograms:
+
+    def __init__(self, window=WINDOW, digits=DIGITS):
+        self.window = window
+        self.layout = HdrLayout(digits)
+        self.start = time.time()
+        # (window, method, name) -> {bucket index: count}, same keys for the corrected counts
+        self.histograms = {}
+        self.corrected = {}
+
+    def on_request(self, request_type, name, response_time, response_length, exception, context, **kwargs):
+        if exception:
+            return
+        key = (int((time.time() - self.start) // self.window), request_type, name)
+        index = self.layout.index
+        counts = self.histograms.get(key)
+        if counts is None:
+            counts = self.histograms[key] = {}
+        bucket = index(int(response_time * 1000))
+        counts[bucket] = counts.get(bucket, 0) + 1
+        lag = context.get("schedule_lag") if context else None
+        if lag is not None:
+            counts = self.corrected.get(key)
+            if counts is None:
+                counts = self.corrected[key] = {}
+            bucket = index(int((response_time + lag) * 1000))
+            counts[bucket] = counts.get(bucket, 0) + 1
+
+    def to_json(self):
+        histograms = []
+        for key in sorted(self.histograms):
+            window, method, name = key
+            entry = {"window": window, "method": method, "name": name, "counts": encode(self.histograms[key])}
+            if key in self.corrected:
+                entry["corrected"] = encode(self.corrected[key])
+            histograms.append(entry)
+        return {
+            "version": 1,
+            "unit": "us",
+            "significant_digits": self.layout.digits,
+            "window_s": self.window,
+            "start": self.start,
+            "histograms": histograms,
+        }
+
+    def dump(self, path):
+        write_dump(self.to_json(), path)
+
+    @classmethod
+    def from_json(cls, dump):
+        histograms = cls(dump["window_s"], dump["significant_digits"])
+        histograms.start = dump["start"]
+        for entry in dump["histograms"]:
+            key = (entry["window"], entry["method"], entry["name"])
+            histograms.histograms[key] = decode(entry["counts"])
+            if "corrected" in entry:
+                histograms.corrected[key] = decode(entry["corrected"])
+        return histograms
+
+    def merge(self, other):
+        # windows are aligned on the wall clock, other's windows shift by its later start
+        if other.layout.digits != self.layout.digits or other.window != self.window:
+            raise ValueError("Histograms with different layouts cannot be merged")
+        shift = round((other.start - self.start) / self.window)
+        for mine, theirs in ((self.histograms, other.histograms), (self.corrected, other.corrected)):
+            for (window, method, name), counts in theirs.items():
+                add_counts(mine.setdefault((window + shift, method, name), {}), counts)
+
+
+def read_dump(path):
+    with gzip.open(path, 'rt') as dump_file:
+        return json.load(dump_file)
+
+
+def write_dump(dump, path):
+    with gzip.open(path, 'wt') as dump_file:
+        json.dump(dump, dump_file, separators=(",", ":"))
+
+
+def merge_dump_files(paths, output_path):
+    dumps = sorted((read_dump(path) for path in paths), key=lambda dump: dump["start"])
+    merged = RequestHistograms.from_json(dumps[0])
+    for dump in dumps[1:]:
+        merged.merge(RequestHistograms.from_json(dump))
+    merged.dump(output_path)
+    return merged
+
+
+def log_stem(logfile):
+    # files written next to the log share its name without .log
+    if not logfile:
+        return "locust"
+    return logfile[:-len(".log")] if logfile.endswith(".log") else logfile
+
+
+def histogram_path(logfile):
+    return log_stem(logfile) + (".hdr.json.gz" if logfile else "_histograms.hdr.json.gz")
+
+
+def install_histograms(events):
+    window = float(os.environ.get(HISTOGRAM_WINDOW_ENV, WINDOW))
+    if window <= 0:
+        return None
+    histograms = RequestHistograms(window, int(os.environ.get(HISTOGRAM_DIGITS_ENV, DIGITS)))
+    events.request.add_listener(histograms.on_request)
+    state = {}
+
+    @events.init.add_listener
+    def _(environment, **kwargs):
+        options = environment.parsed_options
+        state["path"] = histogram_path(getattr(options, "logfile", None) if options else None)
+
+    @events.test_start.add_listener
+    def _(environment, **kwargs):
+        histograms.start = time.time()
+
+    @events.quitting.add_listener
+    def _(environment, **kwargs):
+        if isinstance(environment.runner, MasterRunner):
+            # the master sends no requests, the launcher merges the dumps of the workers
+            return
+        path = state.get("path") or histogram_path(None)
+        histograms.dump(path)
+        logger.info(f"Wrote {len(histograms.histograms)} latency histograms to {path}")
+
+    return histograms
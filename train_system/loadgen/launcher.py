@@ -0,0 +1,155 @@
+# Command line launcher shared by the profile scripts
+# Parses the campaign arguments, exports the generator options to the locust child process
+# and runs locust headless on the calling script, after checking that every deployment unit of the
+# selected services is listening (see topology.py).
+import argparse
+import os
+import subprocess
+import sys
+
+from loadgen.catalog import PROFILES, SERVICES_ENV, selected_services
+from loadgen.distributed import run_distributed
+from loadgen.engine import ENGINES, ENGINE_ENV
+from loadgen.fixtures import DISTRIBUTION_ENV, FIXTURES_ENV, parse_distribution, read_fixtures
+from loadgen.histogram import DIGITS, HISTOGRAM_DIGITS_ENV, HISTOGRAM_WINDOW_ENV, WINDOW
+from loadgen.openloop import ARRIVAL_ENV, ARRIVALS, INFLIGHT_ENV, MAX_INFLIGHT
+from loadgen.payloads import PAYLOAD_MODE_ENV, PAYLOAD_MODES, PAYLOAD_POOL_ENV, PAYLOAD_SEED_ENV
+from loadgen.pools import POOL_ENV
+from loadgen.saturation import SATURATION_CPU, SATURATION_CPU_ENV, SATURATION_LAG, SATURATION_LAG_ENV
+from loadgen.sink import SINK_ENV, SINK_MODES
+from loadgen.topology import preflight
+
+RESULTS_DIRS = {
+    "coarse": "results/coarse",
+    "medium": "results/med",
+    "fine": "results/fine",
+}
+
+
+def distribution(spec):
+    try:
+        parse_distribution(spec)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error))
+    return spec
+
+
+def fixture_file(path):
+    # a missing or malformed file fails here rather than in every locust process
+    try:
+        read_fixtures(path)
+    except (OSError, ValueError) as error:
+        raise argparse.ArgumentTypeError(str(error))
+    return path
+
+
+def add_generator_arguments(parser):
+    parser.add_argument("--engine", choices=list(ENGINES), default="requests", help="Locust HTTP client")
+    parser.add_argument("--request-log", choices=SINK_MODES, default="buffered",
+                        help="How per-request records are written to the log file")
+    parser.add_argument("--services", nargs="+", help="Only run these service users (default: all)")
+    parser.add_argument("--arrival", choices=ARRIVALS, default="closed",
+                        help="closed: constant_pacing users; poisson/deterministic: open-loop arrivals at 1/pacing")
+    parser.add_argument("--max-inflight", type=int, default=MAX_INFLIGHT,
+                        help="Open-loop bound on concurrent requests, arrivals beyond it are dropped")
+    parser.add_argument("--pool-size", type=int, default=0,
+                        help="Share this many keep-alive connections per deployment unit (0: per-user pools)")
+    parser.add_argument("--payload-pool", type=int, default=0,
+                        help="Pre-generate this many unique payloads per write endpoint (0: one per request)")
+    parser.add_argument("--payload-mode", choices=PAYLOAD_MODES, default="round-robin",
+                        help="How pooled payloads are handed out; without-replacement fails the run when a "
+                             "pool runs out, reshuffle reuses it")
+    parser.add_argument("--payload-seed", default="0",
+                        help="Seed of the payload pools and the fixture sampling, mixed with the iteration")
+    parser.add_argument("--fixtures", type=fixture_file, help="ID fixture file sampled instead of the hardcoded IDs (see fixtures.py)")
+    parser.add_argument("--key-distribution", type=distribution, default="uniform",
+                        help="How fixture IDs are sampled: uniform, zipf:S or hot:H:P")
+    parser.add_argument("--skip-preflight", action="store_true",
+                        help="Start even if a deployment unit of the selected services is not listening")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Run a local master and this many worker processes, one per core")
+    parser.add_argument("--histogram-window", type=float, default=WINDOW,
+                        help="Seconds per latency histogram window, 0 disables the histograms")
+    parser.add_argument("--saturation-cpu", type=float, default=SATURATION_CPU,
+                        help="Generator CPU percent above which a second counts as saturated")
+    parser.add_argument("--saturation-lag", type=float, default=SATURATION_LAG,
+                        help="gevent loop lag (ms) above which a second counts as saturated")
+    parser.add_argument("--histogram-digits", type=int, choices=range(1, 6), default=DIGITS,
+                        help="Significant digits the latency histograms resolve")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-u", "--users", type=int, required=True, help="Number of users")
+    parser.add_argument("-r", "--rate", type=int, required=True, help="Spawn rate")
+    parser.add_argument("--run-time", type=str, required=True, help="Run time")
+    parser.add_argument("--iteration", type=int, required=True, help="Iteration number")
+    add_generator_arguments(parser)
+    return parser
+
+
+def generator_env(args):
+    env = dict(os.environ)
+    env[ENGINE_ENV] = args.engine
+    env[SINK_ENV] = args.request_log
+    env[ARRIVAL_ENV] = args.arrival
+    env[INFLIGHT_ENV] = str(args.max_inflight)
+    env[POOL_ENV] = str(args.pool_size)
+    env[PAYLOAD_POOL_ENV] = str(args.payload_pool)
+    env[PAYLOAD_MODE_ENV] = args.payload_mode
+    env[PAYLOAD_SEED_ENV] = f"{args.payload_seed}:{args.iteration}"
+    env[DISTRIBUTION_ENV] = args.key_distribution
+    if args.fixtures:
+        env[FIXTURES_ENV] = os.path.abspath(args.fixtures)
+    env[HISTOGRAM_WINDOW_ENV] = str(args.histogram_window)
+    env[HISTOGRAM_DIGITS_ENV] = str(args.histogram_digits)
+    env[SATURATION_CPU_ENV] = str(args.saturation_cpu)
+    env[SATURATION_LAG_ENV] = str(args.saturation_lag)
+    if args.services:
+        env[SERVICES_ENV] = ",".join(args.services)
+    return env
+
+
+def check_topology(architecture, services=None, skip=False):
+    # a mistyped or stopped unit would otherwise cost a whole run of connection errors
+    if skip:
+        return
+    failures = preflight(architecture, selected_services(services))
+    for name, host, port, error in failures:
+        print(f"Preflight: unit '{name}' of {architecture} is not listening on {host}:{port} ({error})",
+              file=sys.stderr)
+    if failures:
+        sys.exit(f"Preflight failed for {len(failures)} units, use --skip-preflight to run anyway")
+
+
+def run_locust(locustfile, logfile, options, env, workers=0):
+    if workers > 0:
+        return run_distributed(locustfile, logfile, options, env, workers)
+    command = [
+        sys.executable, "-m", "locust",
+        "-f", locustfile,
+        "--headless",
+        *options,
+        "--csv=locust_report",
+        f"--logfile={logfile}"
+    ]
+    return subprocess.call(command, env=env)
+
+
+def main(locustfile, architecture, profile, results_dir=None):
+    args = build_parser().parse_args()
+    check_topology(architecture, args.services, args.skip_preflight)
+    pacing = PROFILES[profile].pacing
+    results_dir = results_dir or RESULTS_DIRS[architecture]
+    os.makedirs(results_dir, exist_ok=True)
+
+    options = [
+        "-u", str(args.users),  # Number of users
+        "-r", str(args.rate),  # Spawn rate
+        "--run-time", args.run_time,
+    ]
+    logfile = f"{results_dir}/locustfile_{pacing}_{args.users}_{args.rate}_{args.run_time}_{args.iteration}"
+    # closed-loop runs keep the old file name, open-loop runs append the arrival mode
+    logfile += ".log" if args.arrival == "closed" else f"_{args.arrival}.log"
+    # locust's exit code, e.g. 1 for a run stopped by an exhausted payload pool, is the script's
+    sys.exit(run_locust(locustfile, logfile, options, generator_env(args), args.workers))
@@ -0,0 +1,74 @@
+# Quota leases between a distributed master and its workers
+# The master keeps the request limits of the active profile; a worker asks for a lease of slots per
+# quota key over locust's custom message channel and serves its users from it locally, asking for
+# the next lease before the current one runs out. A lease is a share of what is left
+# (remaining / (2 * workers), at least 1), so the leases shrink towards the end and the total over
+# all workers is exactly the limit. Profile switches of a load shape, which runs on the master, are
+# sent to the workers as well; requests made for an earlier profile get no slots, so none are lost.
+import logging
+
+from locust.runners import MasterRunner, WorkerRunner
+
+from loadgen.quota import LeasedQuota
+
+REQUEST = "loadgen_quota_request"
+LEASE = "loadgen_quota_lease"
+PROFILE = "loadgen_profile"
+
+logger = logging.getLogger('locust')
+
+
+def lease_size(remaining, workers):
+    return max(1, -(-remaining // (2 * max(workers, 1))))
+
+
+def install_master(runner, active):
+    def on_request(environment, msg):
+        # the worker drops a lease of an earlier profile, slots granted for it would be lost
+        if msg.data["generation"] != active.generation:
+            return
+        quota = active.quotas[msg.data["quota"]]
+        key = msg.data["key"]
+        amount = quota.grant(key, lease_size(quota.remaining(key), runner.worker_count))
+        runner.send_message(LEASE, {"quota": msg.data["quota"], "key": key, "amount": amount,
+                                    "generation": active.generation}, client_id=msg.node_id)
+
+    def broadcast(active):
+        runner.send_message(PROFILE, {"profile": active.name, "generation": active.generation})
+
+    runner.register_message(REQUEST, on_request)
+    active.listeners.append(broadcast)
+
+
+def install_worker(runner, active):
+    def quota_factory(name, limits):
+        def request_lease(key):
+            runner.send_message(REQUEST, {"quota": name, "key": key, "generation": active.generation})
+
+        return LeasedQuota(limits, request_lease)
+
+    def on_lease(environment, msg):
+        if msg.data["generation"] == active.generation:
+            active.quotas[msg.data["quota"]].add_lease(msg.data["key"], msg.data["amount"])
+
+    def on_profile(environment, msg):
+        active.activate(msg.data["profile"], msg.data["generation"])
+
+    runner.register_message(LEASE, on_lease)
+    runner.register_message(PROFILE, on_profile)
+    active.quota_factory = quota_factory
+    active.activate(active.name, active.generation)
+
+
+def install_quota_leases(events, active):
+    @events.init.add_listener
+    def _(environment, **kwargs):
+        if isinstance(environment.runner, MasterRunner):
+            install_master(environment.runner, active)
+        elif isinstance(environment.runner, WorkerRunner):
+            install_worker(environment.runner, active)
+
+    @events.quitting.add_listener
+    def _(environment, **kwargs):
+        if isinstance(environment.runner, MasterRunner):
+            logger.info(f"Quota leases granted: {active.finished + active.total()} requests")
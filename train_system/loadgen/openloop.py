@@ -0,0 +1,115 @@
+# Open-loop request injection
+# In the closed loop (constant_pacing) a user waits for every response, so a slow service lowers its own
+# offered load. In the open loop every user instead schedules arrivals at 1/pacing per second - at fixed
+# intervals ("deterministic") or exponentially distributed ones ("poisson") - and fires each request in
+# its own greenlet without waiting for the previous one. The greenlets of all users share one in-flight
+# bound; arrivals beyond it are dropped and counted, and the in-flight level is logged while running.
+# The arrival time is passed on as the intended send time of the request.
+import logging
+import os
+import random
+import time
+
+import gevent
+from gevent.pool import Group
+from locust.runners import MasterRunner
+
+ARRIVAL_ENV = "LOADGEN_ARRIVAL"
+INFLIGHT_ENV = "LOADGEN_MAX_INFLIGHT"
+ARRIVALS = ("closed", "poisson", "deterministic")
+MAX_INFLIGHT = 1000
+
+logger = logging.getLogger('locust')
+
+
+def arrival_mode():
+    mode = os.environ.get(ARRIVAL_ENV, "closed")
+    if mode not in ARRIVALS:
+        raise ValueError(f"Unknown arrival mode '{mode}', expected one of: {', '.join(ARRIVALS)}")
+    return mode
+
+
+def max_inflight():
+    return int(os.environ.get(INFLIGHT_ENV, MAX_INFLIGHT))
+
+
+def interarrival(mode, mean):
+    return random.expovariate(1 / mean) if mode == "poisson" else mean
+
+
+class InFlight:
+    # greenlets only switch on I/O, so the counters need no lock
+
+    def __init__(self, limit=MAX_INFLIGHT):
+        self.limit = limit
+        self.current = 0
+        self.peak = 0
+        self.sent = 0
+        self.dropped = {}
+        self._reporter = None
+
+    def acquire(self, name):
+        if self.current >= self.limit:
+            self.dropped[name] = self.dropped.get(name, 0) + 1
+            return False
+        self.current += 1
+        self.sent += 1
+        if self.current > self.peak:
+            self.peak = self.current
+        return True
+
+    def release(self):
+        self.current -= 1
+
+    def summary(self):
+        return (f"Open-loop: {self.sent} requests sent, {sum(self.dropped.values())} arrivals dropped, "
+                f"in-flight peak {self.peak}/{self.limit}")
+
+    def _report(self, interval):
+        while True:
+            gevent.sleep(interval)
+            logger.info(f"Open-loop in-flight: {self.current} (peak {self.peak}, "
+                        f"dropped {sum(self.dropped.values())})")
+
+    def install(self, events, interval=5.0):
+        @events.test_start.add_listener
+        def _(environment, **kwargs):
+            if not isinstance(environment.runner, MasterRunner):
+                self._reporter = gevent.spawn(self._report, interval)
+
+        @events.quitting.add_listener
+        def _(environment, **kwargs):
+            if self._reporter is None:
+                return
+            self._reporter.kill(block=False)
+            logger.info(self.summary())
+            for name, dropped in sorted(self.dropped.items()):
+                logger.info(f"Open-loop dropped {dropped} arrivals of {name}")
+
+        return self
+
+
+def make_injector(name, request, active, mode, inflight):
+    # the user's only task; it never returns, locust kills it (and its requests) when the user stops
+    def inject(user):
+        group = Group()
+
+        def fire(intended):
+            try:
+                request(user, intended)
+            finally:
+                inflight.release()
+
+        next_at = time.perf_counter()
+        try:
+            while True:
+                next_at += interarrival(mode, active.pacing)
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    gevent.sleep(delay)
+                if inflight.acquire(name):
+                    group.spawn(fire, next_at)
+        finally:
+            group.kill(block=False)
+
+    return inject
@@ -0,0 +1,179 @@
+# Pacing accuracy of the closed-loop users
+# constant_pacing users are meant to start a task every pacing seconds; under load they start late. For
+# every task start the recorder compares the actual start with the scheduled one (the intended time
+# the pacing wait_time sets, see ActiveProfile.wait_time) and the interval since the user's previous
+# start with the pacing:
+#   drift   actual start - scheduled start; it accumulates when a user cannot keep up
+#   jitter  |interval - pacing|, how irregular the cadence is
+# Both go into HDR histograms (hdr.py) per profile and user class, next to the task count and the
+# achieved per-user rate (1 / mean interval). At the end of the run they are written next to the log
+# as <log name>.pacing.json and the per-profile totals are logged; the files of distributed workers
+# are merged by the launcher.
+import json
+import logging
+import time
+
+from locust.runners import MasterRunner
+
+from loadgen.hdr import DIGITS, HdrLayout, add_counts, decode, encode, percentiles
+from loadgen.histogram import log_stem
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+logger = logging.getLogger('locust')
+
+
+def pacing_path(logfile):
+    return log_stem(logfile) + ".pacing.json"
+
+
+def summary(layout, counts):
+    values = percentiles(layout, counts, PERCENTILES)
+    names = [f"p{q}_ms" for q in PERCENTILES] + ["max_ms"]
+    return dict(zip(names, values))
+
+
+class PacingStats:
+
+    def __init__(self, pacing):
+        self.pacing = pacing
+        self.tasks = 0
+        self.intervals = 0
+        self.interval_total = 0.0
+        self.drift = {}
+        self.jitter = {}
+
+    def add(self, other):
+        self.tasks += other.tasks
+        self.intervals += other.intervals
+        self.interval_total += other.interval_total
+        add_counts(self.drift, other.drift)
+        add_counts(self.jitter, other.jitter)
+
+    def to_json(self, layout):
+        mean_interval = self.interval_total / self.intervals if self.intervals else 0.0
+        return {
+            "pacing_s": self.pacing,
+            "tasks": self.tasks,
+            "intended_rate": round(1 / self.pacing, 3) if self.pacing else None,
+            "achieved_rate": round(1 / mean_interval, 3) if mean_interval else None,
+            "intervals": self.intervals,
+            "interval_total_s": self.interval_total,
+            "drift": {**summary(layout, self.drift), "counts": encode(self.drift)},
+            "jitter": {**summary(layout, self.jitter), "counts": encode(self.jitter)},
+        }
+
+    @classmethod
+    def from_json(cls, entry):
+        stats = cls(entry["pacing_s"])
+        stats.tasks = entry["tasks"]
+        stats.intervals = entry["intervals"]
+        stats.interval_total = entry["interval_total_s"]
+        stats.drift = decode(entry["drift"]["counts"])
+        stats.jitter = decode(entry["jitter"]["counts"])
+        return stats
+
+
+class PacingRecorder:
+    # greenlets only switch on I/O, so the counters need no lock
+
+    def __init__(self, digits=DIGITS):
+        self.layout = HdrLayout(digits)
+        # (profile, user class) -> PacingStats
+        self.stats = {}
+
+    def record(self, user, name, active):
+        now = time.perf_counter()
+        key = (active.name, name)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = PacingStats(active.pacing)
+        stats.tasks += 1
+        index = self.layout.index
+        intended = getattr(user, "intended", None)
+        if intended is not None:
+            bucket = index(int(max(0.0, now - intended) * 1e6))
+            stats.drift[bucket] = stats.drift.get(bucket, 0) + 1
+        last = getattr(user, "_pacing_last_start", None)
+        user._pacing_last_start = now
+        if last is not None:
+            interval = now - last
+            stats.intervals += 1
+            stats.interval_total += interval
+            bucket = index(int(abs(interval - active.pacing) * 1e6))
+            stats.jitter[bucket] = stats.jitter.get(bucket, 0) + 1
+
+    def profiles(self):
+        # per profile the sum over its user classes
+        totals = {}
+        for (profile, _), stats in self.stats.items():
+            totals.setdefault(profile, PacingStats(stats.pacing)).add(stats)
+        return totals
+
+    def to_json(self):
+        classes = {}
+        for (profile, name), stats in sorted(self.stats.items()):
+            classes.setdefault(profile, {})[name] = stats.to_json(self.layout)
+        return {
+            "version": 1,
+            "unit": "us",
+            "significant_digits": self.layout.digits,
+            "profiles": {profile: stats.to_json(self.layout) for profile, stats in sorted(self.profiles().items())},
+            "classes": classes,
+        }
+
+    @classmethod
+    def from_json(cls, dump):
+        recorder = cls(dump["significant_digits"])
+        for profile, classes in dump["classes"].items():
+            for name, entry in classes.items():
+                recorder.stats[(profile, name)] = PacingStats.from_json(entry)
+        return recorder
+
+    def merge(self, other):
+        for key, stats in other.stats.items():
+            self.stats.setdefault(key, PacingStats(stats.pacing)).add(stats)
+
+    def dump(self, path):
+        with open(path, "w") as dump_file:
+            json.dump(self.to_json(), dump_file, indent=1)
+
+    def summaries(self):
+        for profile, stats in sorted(self.profiles().items()):
+            entry = stats.to_json(self.layout)
+            drift, jitter = entry["drift"], entry["jitter"]
+            yield (f"Pacing {profile}: {entry['tasks']} tasks, intended {entry['intended_rate']}/s per user, "
+                   f"achieved {entry['achieved_rate']}/s; drift p50 {drift.get('p50_ms')} p99 {drift.get('p99_ms')} "
+                   f"max {drift.get('max_ms')} ms; jitter p50 {jitter.get('p50_ms')} p99 {jitter.get('p99_ms')} ms")
+
+    def install(self, events):
+        state = {}
+
+        @events.init.add_listener
+        def _(environment, **kwargs):
+            options = environment.parsed_options
+            state["logfile"] = getattr(options, "logfile", None) if options else None
+
+        @events.quitting.add_listener
+        def _(environment, **kwargs):
+            if isinstance(environment.runner, MasterRunner) or not self.stats:
+                return
+            self.dump(pacing_path(state.get("logfile")))
+            for line in self.summaries():
+                logger.info(line)
+
+        return self
+
+
+def merge_pacing_files(paths, output_path):
+    merged = None
+    for path in paths:
+        with open(path) as dump_file:
+            recorder = PacingRecorder.from_json(json.load(dump_file))
+        if merged is None:
+            merged = recorder
+        else:
+            merged.merge(recorder)
+    if merged is not None:
+        merged.dump(output_path)
+    return merged
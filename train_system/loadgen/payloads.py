@@ -0,0 +1,144 @@
+# Pre-generated payload pools for the write endpoints
+# The payload factories of the catalog draw random names and passwords and the body is serialized on
+# every request. With LOADGEN_PAYLOAD_POOL=N (--payload-pool) every endpoint with a payload factory
+# instead gets N unique payloads, generated and serialized to JSON once at import time from a seeded
+# random.Random, so the data a run writes is reproducible. The pool hands them out
+#   round-robin          in generation order, starting over when all were sent
+#   without-replacement  in a seeded shuffled order, each payload at most once; when the pool runs out
+#                        the run fails (exit code 1) instead of writing a payload twice
+#   reshuffle            like without-replacement, but an exhausted pool is reshuffled and reused
+# The number of repeated payloads is logged at the end.
+# The seed is mixed with the endpoint, the iteration and the worker index, so iterations and
+# distributed workers do not write the same data.
+import json
+import logging
+import os
+import random
+
+import gevent
+from locust.exception import StopUser
+from locust.runners import MasterRunner
+
+from loadgen.distributed import WORKER_INDEX_ENV
+
+PAYLOAD_POOL_ENV = "LOADGEN_PAYLOAD_POOL"
+PAYLOAD_SEED_ENV = "LOADGEN_PAYLOAD_SEED"
+PAYLOAD_MODE_ENV = "LOADGEN_PAYLOAD_MODE"
+PAYLOAD_MODES = ("round-robin", "without-replacement", "reshuffle")
+# attempts per payload before a factory is considered unable to produce enough unique payloads
+ATTEMPTS = 100
+
+logger = logging.getLogger('locust')
+
+
+def payload_settings():
+    mode = os.environ.get(PAYLOAD_MODE_ENV, "round-robin")
+    if mode not in PAYLOAD_MODES:
+        raise ValueError(f"Unknown payload mode '{mode}', expected one of: {', '.join(PAYLOAD_MODES)}")
+    return int(os.environ.get(PAYLOAD_POOL_ENV, "0")), os.environ.get(PAYLOAD_SEED_ENV, "0"), mode
+
+
+def generate(factory, size, rng):
+    bodies, seen = [], set()
+    for _ in range(size * ATTEMPTS):
+        body = json.dumps(factory(rng)).encode()
+        if body not in seen:
+            seen.add(body)
+            bodies.append(body)
+            if len(bodies) == size:
+                return bodies
+    raise ValueError(f"{factory.__name__} produced only {len(bodies)} unique payloads of {size}")
+
+
+class PoolExhausted(Exception):
+    pass
+
+
+class PayloadPool:
+
+    def __init__(self, name, factory, size, seed, mode="round-robin"):
+        self.name = name
+        self.mode = mode
+        # str seeds are hashed deterministically, unlike hash() of a tuple
+        self.rng = random.Random(f"{seed}:{name}:{os.environ.get(WORKER_INDEX_ENV, '0')}")
+        self.bodies = generate(factory, size, self.rng)
+        self.order = list(self.bodies)
+        if mode != "round-robin":
+            self.rng.shuffle(self.order)
+        self.position = 0
+        self.handed_out = 0
+        self.reused = 0
+
+    def next(self):
+        if self.position == len(self.order):
+            if self.mode == "without-replacement":
+                raise PoolExhausted(self.name)
+            self.position = 0
+            if self.mode == "reshuffle":
+                self.rng.shuffle(self.order)
+        body = self.order[self.position]
+        self.position += 1
+        self.handed_out += 1
+        if self.handed_out > len(self.order):
+            self.reused += 1
+        return body
+
+    def summary(self):
+        return (f"Payload pool {self.name} ({self.mode}, {len(self.bodies)} payloads): "
+                f"{self.handed_out} handed out, {self.reused} reused")
+
+
+class PayloadPools:
+
+    def __init__(self, size, seed, mode):
+        self.size = size
+        self.seed = seed
+        self.mode = mode
+        self.pools = {}
+        self.environment = None
+        self.failed = False
+
+    def bind(self, endpoint):
+        # the endpoint with its payload factory replaced by a pool of serialized bodies
+        if self.size <= 0 or not callable(endpoint.payload):
+            return endpoint
+        pool = self.pools[endpoint.key] = PayloadPool(
+            f"{endpoint.service}/{endpoint.key}", endpoint.payload, self.size, self.seed, self.mode)
+
+        def payload():
+            try:
+                return pool.next()
+            except PoolExhausted:
+                self.fail(pool)
+                raise StopUser()
+
+        return endpoint._replace(payload=payload)
+
+    def fail(self, pool):
+        # a without-replacement pool ran out: stop the run rather than repeat a payload
+        if self.failed:
+            return
+        self.failed = True
+        logger.error(f"Payload pool {pool.name} is exhausted after {pool.handed_out} unique payloads, stopping "
+                     f"the run; raise --payload-pool or use --payload-mode reshuffle to allow reuse")
+        if self.environment is not None:
+            self.environment.process_exit_code = 1
+            gevent.spawn(self.environment.runner.quit)
+
+    def install(self, events):
+        @events.init.add_listener
+        def _(environment, **kwargs):
+            self.environment = environment
+
+        @events.quitting.add_listener
+        def _(environment, **kwargs):
+            if isinstance(environment.runner, MasterRunner):
+                return
+            for key in sorted(self.pools):
+                pool = self.pools[key]
+                logger.info(pool.summary())
+                if pool.reused:
+                    logger.warning(f"Payload pool {pool.name} was exhausted and reused, raise --payload-pool to "
+                                   f"{pool.handed_out} to write only unique payloads")
+
+        return self
@@ -0,0 +1,169 @@
+# Keep-alive connection pools shared per deployment unit
+# By default every user opens its own connections. With LOADGEN_POOL_SIZE=N (--pool-size) all users
+# whose services run in the same deployment unit (see topology.py) share one bounded pool of N
+# keep-alive connections to its host:port - a blocking urllib3 PoolManager for the requests engine,
+# a geventhttpclient HTTPClientPool for the fast engine. A request that finds every connection busy
+# waits for one, at most POOL_TIMEOUT seconds before it fails; how many requests waited, for how
+# long, and the number of connections opened are reported per unit when locust quits.
+import logging
+import os
+import queue
+import time
+
+from geventhttpclient.client import HTTPClientPool
+from locust.runners import MasterRunner
+from urllib3 import HTTPConnectionPool, PoolManager
+from urllib3.exceptions import ClosedPoolError, EmptyPoolError
+from urllib3.util.connection import is_connection_dropped
+
+from loadgen.topology import service_units, unit_of
+
+POOL_ENV = "LOADGEN_POOL_SIZE"
+POOL_TIMEOUT = 30.0
+
+logger = logging.getLogger('locust')
+
+
+def pool_size():
+    return int(os.environ.get(POOL_ENV, 0))
+
+
+class PoolStats:
+
+    def __init__(self, name, unit, size):
+        self.name = name
+        self.unit = unit
+        self.size = size
+        self.acquired = 0
+        self.waited = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.opened = 0
+
+    def add_wait(self, seconds):
+        # only for checkouts that found every connection busy
+        self.waited += 1
+        self.wait_total += seconds
+        if seconds > self.wait_max:
+            self.wait_max = seconds
+
+    def summary(self):
+        mean = self.wait_total / self.waited * 1000 if self.waited else 0.0
+        return (f"Pool {self.name} ({self.unit.host}:{self.unit.port}, size {self.size}): "
+                f"{self.acquired} requests, {self.waited} waited for a connection, wait mean {mean:.3f} ms "
+                f"max {self.wait_max * 1000:.1f} ms, {self.opened} connections opened")
+
+
+class TimedConnectionPool(HTTPConnectionPool):
+    # subclassed per unit with the unit's PoolStats as stats
+    stats = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # checkouts interrupted while waiting, whose slot urlopen hands back all the same
+        self.unclaimed = 0
+
+    def _get_conn(self, timeout=None):
+        # urllib3's _get_conn, timing only the wait for a busy pool and not the dropped-connection check
+        if self.pool is None:
+            raise ClosedPoolError(self, "Pool is closed.")
+        self.stats.acquired += 1
+        timeout = timeout or POOL_TIMEOUT
+        busy = self.pool.empty()
+        start = time.perf_counter()
+        try:
+            connection = self.pool.get(block=True, timeout=timeout)
+        except queue.Empty:
+            raise EmptyPoolError(self, f"No connection of the pool was free within {timeout} s") from None
+        except BaseException:
+            # a user stopped while waiting, urlopen puts back the slot it never took
+            self.unclaimed += 1
+            raise
+        if busy:
+            self.stats.add_wait(time.perf_counter() - start)
+        if connection and is_connection_dropped(connection):
+            connection.close()
+        return connection or self._new_conn()
+
+    def _put_conn(self, conn):
+        if conn is None and self.unclaimed:
+            self.unclaimed -= 1
+            return
+        super()._put_conn(conn)
+
+    def _new_conn(self):
+        self.stats.opened += 1
+        return super()._new_conn()
+
+
+def requests_pool(stats):
+    manager = PoolManager(num_pools=1, maxsize=stats.size, block=True)
+    pool_class = type("UnitConnectionPool", (TimedConnectionPool,), {"stats": stats})
+    manager.pool_classes_by_scheme = {"http": pool_class}
+    return {"pool_manager": manager}
+
+
+class TimedClientPool(HTTPClientPool):
+
+    def __init__(self, stats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    def get_client(self, url):
+        client = super().get_client(url)
+        connections = client._connection_pool
+        if not getattr(connections, "timed", False):
+            # geventhttpclient builds its socket pool inside HTTPClient, so it is wrapped on first use
+            get_socket, create_socket = connections.get_socket, connections._create_socket
+            stats = self.stats
+
+            def timed_get_socket():
+                stats.acquired += 1
+                busy = connections._semaphore.locked()
+                start = time.perf_counter()
+                sock = get_socket()
+                if busy:
+                    stats.add_wait(time.perf_counter() - start)
+                return sock
+
+            def counted_create_socket():
+                stats.opened += 1
+                return create_socket()
+
+            connections.get_socket, connections._create_socket = timed_get_socket, counted_create_socket
+            connections.timed = True
+        return client
+
+
+def fast_pool(stats):
+    return {"client_pool": TimedClientPool(stats, concurrency=stats.size)}
+
+
+class SharedPools:
+
+    def __init__(self, architecture, size, engine):
+        self.architecture = architecture
+        self.size = size
+        self.factory = fast_pool if engine == "fast" else requests_pool
+        self.stats = {}
+        self._attributes = {}
+
+    def attributes(self, service):
+        # class attributes that make a user class use its unit's pool
+        if self.size <= 0:
+            return {}
+        name = service_units(self.architecture)[service]
+        if name not in self._attributes:
+            self.stats[name] = PoolStats(name, unit_of(self.architecture, service), self.size)
+            self._attributes[name] = self.factory(self.stats[name])
+        return self._attributes[name]
+
+    def install(self, events):
+        @events.quitting.add_listener
+        def _(environment, **kwargs):
+            if isinstance(environment.runner, MasterRunner):
+                return
+            for name in sorted(self.stats):
+                logger.info(self.stats[name].summary())
+
+        return self
@@ -0,0 +1,97 @@
+# Per-service request quota shared by all users of a locustfile
+# A slot is reserved without holding a lock across the HTTP call, so every user of a service
+# can have a request in flight at the same time and concurrency scales with -u.
+# With distributed workers the master keeps the TaskQuota and grants slots in leases, which the
+# workers consume through a LeasedQuota (see lease.py), so the limits hold across all workers.
+import time
+from itertools import islice
+from operator import length_hint
+
+from gevent.event import Event
+
+
+class TaskQuota:
+
+    def __init__(self, limits):
+        self.limits = {key: int(value) for key, value in limits.items()}
+        self._slots = {key: iter(range(value)) for key, value in self.limits.items()}
+
+    def reserve(self, key):
+        # next() on a range iterator is a single C call, so two greenlets (or threads)
+        # can never take the same slot and an exhausted quota is never over-issued
+        return next(self._slots[key], None) is not None
+
+    def used(self, key):
+        return self.limits[key] - length_hint(self._slots[key])
+
+    def remaining(self, key):
+        return length_hint(self._slots[key])
+
+    def counters(self):
+        return {key: self.used(key) for key in self.limits}
+
+    def total(self):
+        return sum(self.counters().values())
+
+    def grant(self, key, amount):
+        # takes up to amount slots at once, for a lease to a worker
+        return sum(1 for _ in islice(self._slots[key], amount))
+
+
+class LeaseTimeout(Exception):
+    pass
+
+
+class LeasedQuota(TaskQuota):
+    # worker side of a quota kept by the master: slots come from leases, the next lease is requested
+    # when half of the last one is used, and a user only waits for the master when the lease ran out
+
+    def __init__(self, limits, request_lease, timeout=5.0):
+        super().__init__(limits)
+        self._slots = {key: iter(()) for key in self.limits}
+        self.granted = dict.fromkeys(self.limits, 0)
+        self.exhausted = set()
+        self.timeout = timeout
+        self._request_lease = request_lease
+        self._last_lease = dict.fromkeys(self.limits, 0)
+        self._pending = {}
+
+    def reserve(self, key):
+        # False only once the master has no slots left; other users waiting on the same lease may take
+        # all of it, so a waiter asks again until it gets a slot or the master stays silent for timeout
+        deadline = None
+        while True:
+            slots = self._slots[key]
+            if next(slots, None) is not None:
+                if (key not in self._pending and key not in self.exhausted
+                        and length_hint(slots) <= self._last_lease[key] // 2):
+                    self._ask(key)
+                return True
+            if key in self.exhausted:
+                return False
+            if deadline is None:
+                deadline = time.monotonic() + self.timeout
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise LeaseTimeout(f"No lease for {key} from the master within {self.timeout} s")
+            pending = self._pending.get(key) or self._ask(key)
+            pending.wait(remaining)
+
+    def _ask(self, key):
+        pending = self._pending[key] = Event()
+        self._request_lease(key)
+        return pending
+
+    def add_lease(self, key, amount):
+        if amount:
+            self._slots[key] = iter(range(length_hint(self._slots[key]) + amount))
+            self.granted[key] += amount
+            self._last_lease[key] = amount
+        else:
+            self.exhausted.add(key)
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            pending.set()
+
+    def used(self, key):
+        return self.granted[key] - length_hint(self._slots[key])
@@ -0,0 +1,164 @@
+# Generator saturation detector
+# While the test runs a greenlet sleeps in short ticks and measures how late the gevent loop wakes it
+# up (loop lag); once per second it records the process's CPU utilisation (100% = the one core locust
+# runs on), the max and mean loop lag, the running users and, with open-loop arrivals, the requests in
+# flight (openloop_inflight, left empty in closed loop where nothing counts them). A second
+# above LOADGEN_SATURATION_CPU percent (--saturation-cpu) or with a loop lag above
+# LOADGEN_SATURATION_LAG ms (--saturation-lag) is saturated; a run with SATURATED_SECONDS or more of
+# them measured the generator as much as the system under test and is flagged as untrustworthy.
+# The series goes next to the log as <log name>.saturation.csv and the flag as <log name>.saturation.json,
+# which data_process reads to leave flagged runs out. Distributed workers are merged by the launcher.
+import csv
+import json
+import logging
+import os
+import time
+
+import gevent
+from locust.runners import MasterRunner
+
+from loadgen.histogram import log_stem
+
+SATURATION_CPU_ENV = "LOADGEN_SATURATION_CPU"
+SATURATION_LAG_ENV = "LOADGEN_SATURATION_LAG"
+SATURATION_CPU = 90.0
+SATURATION_LAG = 10.0
+# a single busy second (user spawn, a GC pause) does not flag a run
+SATURATED_SECONDS = 3
+TICK = 0.05
+SERIES_HEADER = ["second", "cpu_percent", "loop_lag_max_ms", "loop_lag_mean_ms", "users", "openloop_inflight",
+                 "saturated"]
+
+logger = logging.getLogger('locust')
+
+
+def saturation_paths(logfile):
+    stem = log_stem(logfile)
+    return stem + ".saturation.csv", stem + ".saturation.json"
+
+
+class SaturationMonitor:
+
+    def __init__(self, cpu_limit=SATURATION_CPU, lag_limit=SATURATION_LAG, inflight=None):
+        self.cpu_limit = cpu_limit
+        self.lag_limit = lag_limit
+        self.inflight = inflight
+        self.series = []
+        self._sampler = None
+
+    def _sample(self, runner):
+        start = last_wall = time.perf_counter()
+        last_cpu = time.process_time()
+        lags = []
+        while True:
+            before = time.perf_counter()
+            gevent.sleep(TICK)
+            now = time.perf_counter()
+            lags.append(max(0.0, now - before - TICK) * 1000)
+            if now - last_wall < 1.0:
+                continue
+            cpu = time.process_time()
+            cpu_percent = (cpu - last_cpu) / (now - last_wall) * 100
+            lag_max, lag_mean = max(lags), sum(lags) / len(lags)
+            self.series.append([
+                round(now - start), round(cpu_percent, 1), round(lag_max, 2), round(lag_mean, 2), runner.user_count,
+                self.inflight.current if self.inflight else "",
+                int(cpu_percent > self.cpu_limit or lag_max > self.lag_limit),
+            ])
+            last_wall, last_cpu, lags = now, cpu, []
+
+    def flag(self):
+        saturated = sum(row[-1] for row in self.series)
+        return {
+            "saturated": saturated >= SATURATED_SECONDS,
+            "saturated_seconds": saturated,
+            "samples": len(self.series),
+            "cpu_max_percent": max((row[1] for row in self.series), default=0.0),
+            "loop_lag_max_ms": max((row[2] for row in self.series), default=0.0),
+            "thresholds": {"cpu_percent": self.cpu_limit, "loop_lag_ms": self.lag_limit,
+                           "seconds": SATURATED_SECONDS},
+        }
+
+    def write(self, logfile):
+        series_path, flag_path = saturation_paths(logfile)
+        with open(series_path, "w", newline="") as series_file:
+            writer = csv.writer(series_file)
+            writer.writerow(SERIES_HEADER)
+            writer.writerows(self.series)
+        flag = self.flag()
+        with open(flag_path, "w") as flag_file:
+            json.dump(flag, flag_file, indent=2)
+        return flag
+
+    def install(self, events):
+        state = {}
+
+        @events.init.add_listener
+        def _(environment, **kwargs):
+            options = environment.parsed_options
+            state["logfile"] = getattr(options, "logfile", None) if options else None
+
+        @events.test_start.add_listener
+        def _(environment, **kwargs):
+            # the master sends no requests, its load says nothing about the measurements
+            if not isinstance(environment.runner, MasterRunner):
+                self._sampler = gevent.spawn(self._sample, environment.runner)
+
+        @events.test_stop.add_listener
+        def _(environment, **kwargs):
+            if self._sampler is not None:
+                self._sampler.kill(block=False)
+
+        @events.quitting.add_listener
+        def _(environment, **kwargs):
+            if self._sampler is None:
+                return
+            self._sampler.kill(block=False)
+            flag = self.write(state.get("logfile"))
+            if flag["saturated"]:
+                logger.warning(f"Generator saturated for {flag['saturated_seconds']} of {flag['samples']} s "
+                               f"(cpu max {flag['cpu_max_percent']}%, loop lag max {flag['loop_lag_max_ms']} ms), "
+                               f"the run is flagged as untrustworthy")
+            else:
+                logger.info(f"Generator not saturated (cpu max {flag['cpu_max_percent']}%, "
+                            f"loop lag max {flag['loop_lag_max_ms']} ms)")
+
+        return self
+
+
+def install_saturation_monitor(events, inflight=None):
+    cpu_limit = float(os.environ.get(SATURATION_CPU_ENV, SATURATION_CPU))
+    lag_limit = float(os.environ.get(SATURATION_LAG_ENV, SATURATION_LAG))
+    return SaturationMonitor(cpu_limit, lag_limit, inflight).install(events)
+
+
+def merge_saturation(logfiles, output_logfile):
+    # one series with a worker column; the run is saturated when any worker was
+    flags, rows = [], []
+    for worker, logfile in enumerate(logfiles):
+        series_path, flag_path = saturation_paths(logfile)
+        if not os.path.exists(flag_path):
+            continue
+        with open(flag_path) as flag_file:
+            flags.append(json.load(flag_file))
+        with open(series_path, newline="") as series_file:
+            rows += [[worker] + row for row in list(csv.reader(series_file))[1:]]
+    if not flags:
+        return None
+    merged = {
+        "saturated": any(flag["saturated"] for flag in flags),
+        "saturated_seconds": max(flag["saturated_seconds"] for flag in flags),
+        "samples": max(flag["samples"] for flag in flags),
+        "cpu_max_percent": max(flag["cpu_max_percent"] for flag in flags),
+        "loop_lag_max_ms": max(flag["loop_lag_max_ms"] for flag in flags),
+        "thresholds": flags[0]["thresholds"],
+        "workers": len(flags),
+    }
+    series_path, flag_path = saturation_paths(output_logfile)
+    with open(series_path, "w", newline="") as series_file:
+        writer = csv.writer(series_file)
+        writer.writerow(["worker"] + SERIES_HEADER)
+        writer.writerows(rows)
+    with open(flag_path, "w") as flag_file:
+        json.dump(merged, flag_file, indent=2)
+    return merged
@@ -0,0 +1,172 @@
+# Load shapes for running several profiles back to back in one locust process
+# A shape gives the user count and spawn rate at t seconds into its stage; a stage pairs a shape with
+# the profile (pacing and request limits, see PROFILES in catalog.py) the users run with meanwhile.
+# ScheduleShape walks the stages on locust's one-second tick and switches the active profile at every
+# stage boundary, so burst_high, even_low, ... follow each other with exact timing.
+# Stages are described by a spec, a list of dicts such as
+#   {"profile": "burst_high", "shape": "plateau", "users": 80, "spawn_rate": 40, "duration": 10}
+# where the remaining keys are the arguments of the shape; stages without a profile idle the services.
+import json
+import logging
+import math
+from collections import namedtuple
+
+from locust import LoadTestShape
+
+SCHEDULE_ENV = "LOADGEN_SCHEDULE"
+
+logger = logging.getLogger('locust')
+
+Stage = namedtuple("Stage", "profile shape")
+
+
+def _rate(users, spawn_rate):
+    # by default a stage starts all its users within one tick
+    return spawn_rate if spawn_rate is not None else max(users, 1)
+
+
+class Plateau:
+
+    def __init__(self, users, duration, spawn_rate=None):
+        self.users = users
+        self.duration = duration
+        self.spawn_rate = _rate(users, spawn_rate)
+
+    def at(self, t):
+        return self.users, self.spawn_rate
+
+
+class Ramp:
+
+    def __init__(self, start_users, end_users, duration):
+        self.start_users = start_users
+        self.end_users = end_users
+        self.duration = duration
+        self.spawn_rate = max(abs(end_users - start_users) / duration, 1)
+
+    def at(self, t):
+        users = self.start_users + (self.end_users - self.start_users) * min(t / self.duration, 1)
+        return round(users), self.spawn_rate
+
+
+class Step:
+
+    def __init__(self, start_users, end_users, step_users, step_time, spawn_rate=None):
+        self.start_users = start_users
+        self.step_users = step_users
+        self.step_time = step_time
+        self.steps = math.ceil(abs(end_users - start_users) / step_users)
+        self.end_users = end_users
+        self.duration = step_time * (self.steps + 1)
+        self.spawn_rate = _rate(step_users, spawn_rate)
+
+    def at(self, t):
+        step = min(int(t // self.step_time), self.steps)
+        direction = 1 if self.end_users >= self.start_users else -1
+        users = self.start_users + direction * step * self.step_users
+        return (min(users, self.end_users) if direction > 0 else max(users, self.end_users)), self.spawn_rate
+
+
+class Spike:
+
+    def __init__(self, base_users, peak_users, duration, spike_at, spike_length, spawn_rate=None):
+        self.base_users = base_users
+        self.peak_users = peak_users
+        self.duration = duration
+        self.spike_at = spike_at
+        self.spike_length = spike_length
+        self.spawn_rate = _rate(peak_users, spawn_rate)
+
+    def at(self, t):
+        in_spike = self.spike_at <= t < self.spike_at + self.spike_length
+        return (self.peak_users if in_spike else self.base_users), self.spawn_rate
+
+
+class SquareWave:
+    # bursts of high_users for duty * period seconds at the start of every period, low_users in between
+
+    def __init__(self, low_users, high_users, period, duration, duty=0.5, spawn_rate=None):
+        self.low_users = low_users
+        self.high_users = high_users
+        self.period = period
+        self.duration = duration
+        self.duty = duty
+        self.spawn_rate = _rate(high_users, spawn_rate)
+
+    def at(self, t):
+        high = t % self.period < self.duty * self.period
+        return (self.high_users if high else self.low_users), self.spawn_rate
+
+
+SHAPES = {
+    "plateau": Plateau,
+    "ramp": Ramp,
+    "step": Step,
+    "spike": Spike,
+    "square": SquareWave,
+}
+
+
+def stages_from_spec(spec):
+    stages = []
+    for item in spec:
+        arguments = dict(item)
+        profile = arguments.pop("profile", None)
+        kind = arguments.pop("shape", "plateau")
+        if kind not in SHAPES:
+            raise ValueError(f"Unknown shape '{kind}', expected one of: {', '.join(SHAPES)}")
+        stages.append(Stage(profile, SHAPES[kind](**arguments)))
+    return stages
+
+
+def load_spec(path):
+    with open(path) as spec_file:
+        return json.load(spec_file)
+
+
+def campaign_spec(profiles, users, rate, burst_time=10, even_time=120, pause=30, reset_time=110):
+    # the old campaign as one schedule: a plateau per profile followed by the recovery pause
+    spec = []
+    for profile in profiles:
+        burst = profile.startswith("burst")
+        spec.append({"profile": profile, "shape": "plateau", "users": users, "spawn_rate": rate,
+                     "duration": burst_time if burst else even_time})
+        spec.append({"shape": "plateau", "users": 0, "duration": pause + (reset_time if burst else 0)})
+    return spec[:-1]
+
+
+class ScheduleShape(LoadTestShape):
+    # subclassed by schedule_shape(); users still waiting out the pacing of the previous profile keep
+    # that wait, so stages with different profiles are best separated by an idle stage
+    abstract = True
+    stages = []
+    active = None
+
+    def __init__(self):
+        super().__init__()
+        self._current = None
+        self._starts = []
+        elapsed = 0.0
+        for stage in self.stages:
+            self._starts.append(elapsed)
+            elapsed += stage.shape.duration
+        self.duration = elapsed
+
+    def tick(self):
+        run_time = self.get_run_time()
+        for index, stage in enumerate(self.stages):
+            if run_time < self._starts[index] + stage.shape.duration:
+                break
+        else:
+            return None
+        if index != self._current:
+            self._current = index
+            if stage.profile is not None:
+                self.active.activate(stage.profile)
+            logger.info(f"Stage {index + 1}/{len(self.stages)}: {stage.profile or 'idle'} "
+                        f"{type(stage.shape).__name__.lower()} for {stage.shape.duration}s at {run_time:.1f}s")
+        return stage.shape.at(run_time - self._starts[index])
+
+
+def schedule_shape(stages, active):
+    return type("ProfileSchedule", (ScheduleShape,), {"stages": stages, "active": active})
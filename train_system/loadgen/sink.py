@@ -0,0 +1,140 @@
+# Request-record sink for the load test scripts
+# The events.request listener only appends a tuple to a bounded in-memory ring; a background
+# greenlet formats the records and writes them to the locust log file in batches, so string
+# formatting and file I/O are taken off the request hot path.
+# The lines have the same layout as the ones written through logger.info/logger.error,
+# so data_process/log_wash.py reads both. Successful requests that were scheduled (see
+# RequestTemplate.send() in templates.py) end in "lag <ms>ms": how much later than intended they were sent.
+import logging
+import os
+import time
+from collections import deque
+
+import gevent
+from locust.log import HOSTNAME
+
+SINK_ENV = "LOADGEN_REQUEST_LOG"
+SINK_MODES = ("buffered", "sync", "off")
+
+logger = logging.getLogger('locust')
+
+
+def sink_mode():
+    mode = os.environ.get(SINK_ENV, "buffered")
+    if mode not in SINK_MODES:
+        raise ValueError(f"Unknown request log mode '{mode}', expected one of: {', '.join(SINK_MODES)}")
+    return mode
+
+
+def schedule_lag(context):
+    return context.get("schedule_lag") if context else None
+
+
+def lag_suffix(lag):
+    return "" if lag is None else f" lag {lag:.3f}ms"
+
+
+def log_request(request_type, name, response_time, response_length, exception, context, **kwargs):
+    if exception:
+        logger.error(f'FAILURE: {request_type} {name} {response_time}ms {exception}')
+    else:
+        lag = lag_suffix(schedule_lag(context))
+        logger.info(f'SUCCESS: {request_type} {name} {response_time}ms {response_length} bytes{lag}')
+
+
+class RequestSink:
+
+    def __init__(self, capacity=200000, batch_size=5000, flush_interval=0.5):
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.records = deque()
+        self.written = 0
+        self.dropped = 0
+        self._fd = None
+        self._greenlet = None
+        self._second = None
+        self._second_text = ""
+
+    def on_request(self, request_type, name, response_time, response_length, exception, context, **kwargs):
+        if len(self.records) >= self.capacity:
+            self.dropped += 1
+            return
+        self.records.append((time.time(), request_type, name, response_time, response_length, exception,
+                             schedule_lag(context)))
+
+    def start(self, path=None):
+        # O_APPEND makes every batch a single atomic append, so lines never interleave with
+        # the ones locust writes to the same file
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644) if path else 2
+        self._greenlet = gevent.spawn(self._run)
+
+    def stop(self):
+        if self._greenlet is not None:
+            self._greenlet.kill()
+            self._greenlet = None
+        self.flush()
+        if self.dropped:
+            logger.warning(f"Request log sink dropped {self.dropped} records (capacity {self.capacity})")
+        if self._fd is not None and self._fd != 2:
+            os.close(self._fd)
+        self._fd = None
+
+    def flush(self):
+        while self.records:
+            self._write_batch()
+
+    def _run(self):
+        while True:
+            gevent.sleep(self.flush_interval)
+            while len(self.records) >= self.batch_size:
+                self._write_batch()
+                gevent.sleep(0)
+            if self.records:
+                self._write_batch()
+
+    def _write_batch(self):
+        records = self.records
+        lines = []
+        for _ in range(min(len(records), self.batch_size)):
+            lines.append(self._format(*records.popleft()))
+        if self._fd is not None:
+            os.write(self._fd, "".join(lines).encode())
+        self.written += len(lines)
+
+    def _asctime(self, timestamp):
+        second = int(timestamp)
+        if second != self._second:
+            self._second = second
+            self._second_text = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second))
+        return f"{self._second_text},{int((timestamp - second) * 1000):03d}"
+
+    def _format(self, timestamp, request_type, name, response_time, response_length, exception, lag):
+        asctime = self._asctime(timestamp)
+        if exception:
+            return f"[{asctime}] {HOSTNAME}/ERROR/locust: FAILURE: {request_type} {name} {response_time}ms {exception}\n"
+        return (f"[{asctime}] {HOSTNAME}/INFO/locust: SUCCESS: {request_type} {name} {response_time}ms "
+                f"{response_length} bytes{lag_suffix(lag)}\n")
+
+
+def install_request_log(events):
+    mode = sink_mode()
+    if mode == "sync":
+        events.request.add_listener(log_request)
+        return None
+    if mode == "off":
+        return None
+
+    sink = RequestSink()
+    events.request.add_listener(sink.on_request)
+
+    @events.init.add_listener
+    def _(environment, **kwargs):
+        options = environment.parsed_options
+        sink.start(getattr(options, "logfile", None) if options else None)
+
+    @events.quitting.add_listener
+    def _(environment, **kwargs):
+        sink.stop()
+
+    return sink
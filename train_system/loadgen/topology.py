@@ -0,0 +1,150 @@
+# Deployment topology of the train-ticketing system under test
+# Per architecture, every deployment unit (one process/container listening on one host:port) lists
+# the logical services of the load test it serves: the coarse-grained build packs four or five services
+# into one unit, the fine-grained build mostly deploys one service per unit. The users, the readiness
+# probes of campaign.py and the preflight port check all resolve service addresses from here.
+import socket
+from collections import namedtuple
+
+Unit = namedtuple("Unit", "host port services")
+
+TOPOLOGY = {
+    "coarse": {
+        "station": Unit("localhost", 12345, (
+            "StationService", "StationFoodService", "Travel2Service", "TravelPlanService",
+        )),
+        "price": Unit("localhost", 17525, (
+            "PriceService", "AdminTravelService", "AdminTravelService2", "RebookService", "WaitOrderService",
+        )),
+        "train-food": Unit("localhost", 14567, ("TrainFoodService", "TrainService", "SeatService", "SecurityService")),
+        "route": Unit("localhost", 12346, ("RouteService", "UserService", "TravelService", "RoutePlanService")),
+        "contacts": Unit("localhost", 12347, (
+            "ContactsService", "ConfigService", "ConsignPriceService", "ConsignService",
+        )),
+        "admin-basic-info": Unit("localhost", 18767, (
+            "AdminBasicInfoService", "AdminBasicInfoService3", "AdminOrderService", "AdminRouteService",
+        )),
+        "basic": Unit("localhost", 18888, ("BasicService", "AdminUserService", "AssuranceService", "CancelService")),
+        "order": Unit("localhost", 17853, ("OrderService", "OrderService2", "NotificationService", "PaymentService")),
+        "order-other": Unit("localhost", 18673, (
+            "OrderOtherService", "InsidePaymentService", "OrderOther2Service", "PreserveOtherService",
+        )),
+        "execute": Unit("localhost", 18856, ("ExecuteService", "FoodDeliverService", "FoodService", "PreserveService")),
+    },
+    "medium": {
+        "station": Unit("localhost", 12345, ("StationService", "StationFoodService")),
+        "price": Unit("localhost", 16579, ("PriceService", "RebookService")),
+        "train-food": Unit("localhost", 14567, ("TrainFoodService", "TrainService")),
+        "route": Unit("localhost", 11178, ("RouteService", "RoutePlanService")),
+        "contacts": Unit("localhost", 12347, ("ContactsService", "ConsignService")),
+        "admin-basic-info": Unit("localhost", 18767, ("AdminBasicInfoService", "AdminBasicInfoService3")),
+        "admin-order": Unit("localhost", 16113, ("AdminOrderService", "AdminRouteService")),
+        "basic": Unit("localhost", 15680, ("BasicService", "CancelService")),
+        "order": Unit("localhost", 12031, ("OrderService", "OrderService2")),
+        "order-other": Unit("localhost", 12032, ("OrderOtherService", "OrderOther2Service")),
+        "seat": Unit("localhost", 18898, ("SeatService", "SecurityService")),
+        "travel2": Unit("localhost", 16346, ("Travel2Service", "TravelPlanService")),
+        "user": Unit("localhost", 12346, ("UserService", "TravelService")),
+        "admin-travel": Unit("localhost", 17525, ("AdminTravelService", "AdminTravelService2", "WaitOrderService")),
+        "admin-user": Unit("localhost", 18888, ("AdminUserService", "AssuranceService")),
+        "config": Unit("localhost", 15679, ("ConfigService", "ConsignPriceService")),
+        "notification": Unit("localhost", 17853, ("NotificationService", "PaymentService")),
+        "execute": Unit("localhost", 18957, ("ExecuteService", "FoodDeliverService")),
+        "food": Unit("localhost", 18856, ("FoodService", "PreserveService")),
+        "inside-payment": Unit("localhost", 18673, ("InsidePaymentService", "PreserveOtherService")),
+    },
+    "fine": {
+        "station": Unit("localhost", 12345, ("StationService",)),
+        "price": Unit("localhost", 16579, ("PriceService",)),
+        "train-food": Unit("localhost", 19999, ("TrainFoodService",)),
+        "train": Unit("localhost", 14567, ("TrainService",)),
+        "route": Unit("localhost", 11178, ("RouteService",)),
+        "contacts": Unit("localhost", 12347, ("ContactsService",)),
+        "admin-basic-info": Unit("localhost", 18767, ("AdminBasicInfoService",)),
+        "admin-basic-info3": Unit("localhost", 18769, ("AdminBasicInfoService3",)),
+        "admin-order": Unit("localhost", 16112, ("AdminOrderService",)),
+        "basic": Unit("localhost", 15680, ("BasicService",)),
+        "order": Unit("localhost", 12031, ("OrderService",)),
+        "order2": Unit("localhost", 12033, ("OrderService2",)),
+        "order-other": Unit("localhost", 12032, ("OrderOtherService",)),
+        "seat": Unit("localhost", 18898, ("SeatService",)),
+        "station-food": Unit("localhost", 18855, ("StationFoodService",)),
+        "travel2": Unit("localhost", 16346, ("Travel2Service",)),
+        "user": Unit("localhost", 12342, ("UserService",)),
+        "admin-travel": Unit("localhost", 16114, ("AdminTravelService", "AdminTravelService2")),
+        "admin-route": Unit("localhost", 16113, ("AdminRouteService",)),
+        "admin-user": Unit("localhost", 16115, ("AdminUserService",)),
+        "assurance": Unit("localhost", 18888, ("AssuranceService",)),
+        "config": Unit("localhost", 15679, ("ConfigService",)),
+        "consign-price": Unit("localhost", 16110, ("ConsignPriceService",)),
+        "consign": Unit("localhost", 16111, ("ConsignService",)),
+        "notification": Unit("localhost", 17853, ("NotificationService",)),
+        "security": Unit("localhost", 11188, ("SecurityService",)),
+        "travel": Unit("localhost", 12346, ("TravelService",)),
+        "cancel": Unit("localhost", 18885, ("CancelService",)),
+        "execute": Unit("localhost", 12386, ("ExecuteService",)),
+        "food-deliver": Unit("localhost", 18957, ("FoodDeliverService",)),
+        "food": Unit("localhost", 18856, ("FoodService",)),
+        "inside-payment": Unit("localhost", 18673, ("InsidePaymentService",)),
+        "order-other2": Unit("localhost", 12034, ("OrderOther2Service",)),
+        "payment": Unit("localhost", 19001, ("PaymentService",)),
+        "preserve": Unit("localhost", 14568, ("PreserveService",)),
+        "rebook": Unit("localhost", 18886, ("RebookService",)),
+        "wait-order": Unit("localhost", 17525, ("WaitOrderService",)),
+        "travel-plan": Unit("localhost", 14322, ("TravelPlanService",)),
+        "route-plan": Unit("localhost", 14578, ("RoutePlanService",)),
+        "preserve-other": Unit("localhost", 14569, ("PreserveOtherService",)),
+    },}
+
+
+def service_units(architecture):
+    return {service: name for name, unit in TOPOLOGY[architecture].items() for service in unit.services}
+
+
+def unit_of(architecture, service):
+    return TOPOLOGY[architecture][service_units(architecture)[service]]
+
+
+def base_url(architecture, service):
+    unit = unit_of(architecture, service)
+    return f"http://{unit.host}:{unit.port}"
+
+
+def validate(services):
+    # every service must be deployed exactly once per architecture, on distinct addresses per unit
+    problems = []
+    for architecture, units in TOPOLOGY.items():
+        deployed = [service for unit in units.values() for service in unit.services]
+        for service in sorted(set(services) - set(deployed)):
+            problems.append(f"{architecture}: {service} is not deployed in any unit")
+        for service in sorted({service for service in deployed if deployed.count(service) > 1}):
+            problems.append(f"{architecture}: {service} is deployed in more than one unit")
+        addresses = [(unit.host, unit.port) for unit in units.values()]
+        for host, port in sorted({address for address in addresses if addresses.count(address) > 1}):
+            problems.append(f"{architecture}: {host}:{port} is used by more than one unit")
+    return problems
+
+
+def preflight(architecture, services, timeout=1.0):
+    # connects once to every unit serving one of the services; returns (unit, host, port, error) failures
+    units = service_units(architecture)
+    failures = []
+    for name in sorted({units[service] for service in services}):
+        unit = TOPOLOGY[architecture][name]
+        try:
+            socket.create_connection((unit.host, unit.port), timeout=timeout).close()
+        except OSError as error:
+            failures.append((name, unit.host, unit.port, error))
+    return failures
+
+
+if __name__ == "__main__":
+    # python -m loadgen.topology [architecture...]: list the units and whether they are listening
+    import sys
+
+    for architecture in sys.argv[1:] or list(TOPOLOGY):
+        failed = {name for name, _, _, _ in preflight(architecture, list(service_units(architecture)))}
+        print(f"{architecture}:")
+        for name, unit in TOPOLOGY[architecture].items():
+            state = "down" if name in failed else "up"
+            print(f"  {name:<20} {unit.host}:{unit.port:<6} {state:<5} {', '.join(unit.services)}")
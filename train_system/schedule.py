@@ -0,0 +1,67 @@
+# Runs a schedule of profiles in one locust process instead of one process per profile
+# The stages come from a JSON spec (see loadgen/shapes.py) or, without --spec, mirror the campaign:
+# every selected profile as a plateau of -u users followed by its recovery pause. Stage switches are
+# logged, the request log is written to results/<arch>/schedule_<spec>_<iteration>[_<arrival>].log
+# (open-loop runs append the arrival mode, as the profile scripts do). data_process/batch_wash.py
+# washes these logs with the profile of the running stage per request and indexes them in schedules.csv.
+# Usage: python schedule.py --arch coarse [--spec schedule.json | --profiles burst_high even_low] --iteration 1
+import argparse
+import json
+import os
+import sys
+
+from locust import events
+
+from loadgen.catalog import PROFILES, ActiveProfile, build_users
+from loadgen.histogram import install_histograms
+from loadgen.launcher import RESULTS_DIRS, add_generator_arguments, check_topology, generator_env, run_locust
+from loadgen.shapes import SCHEDULE_ENV, campaign_spec, load_spec, schedule_shape, stages_from_spec
+from loadgen.sink import install_request_log
+
+ARCHITECTURE_ENV = "LOADGEN_ARCHITECTURE"
+
+architecture = os.environ.get(ARCHITECTURE_ENV, "coarse")
+stages = stages_from_spec(json.loads(os.environ.get(SCHEDULE_ENV) or "[]"))
+
+if stages and __name__ != "__main__":
+    active = ActiveProfile(next(stage.profile for stage in stages if stage.profile))
+    request_sink = install_request_log(events)
+    request_histograms = install_histograms(events)
+    globals().update(build_users(architecture, active))
+    ProfileSchedule = schedule_shape(stages, active)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--arch", choices=list(RESULTS_DIRS), required=True, help="Architecture under test")
+    parser.add_argument("--spec", help="JSON list of stages (default: the campaign of --profiles)")
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=list(PROFILES))
+    parser.add_argument("-u", "--users", type=int, default=80, help="Number of users")
+    parser.add_argument("-r", "--rate", type=int, default=40, help="Spawn rate")
+    parser.add_argument("--runtime-burst", type=float, default=10, help="Burst stage length (s)")
+    parser.add_argument("--runtime-even", type=float, default=120, help="Even stage length (s)")
+    parser.add_argument("--delay", type=float, default=30, help="Idle stage after every profile (s)")
+    parser.add_argument("--reset-time", type=float, default=110, help="Extra idle time after bursts (s)")
+    parser.add_argument("--iteration", type=int, default=1, help="Iteration number")
+    add_generator_arguments(parser)
+    args = parser.parse_args()
+    check_topology(args.arch, args.services, args.skip_preflight)
+
+    if args.spec:
+        spec = load_spec(args.spec)
+        name = os.path.splitext(os.path.basename(args.spec))[0]
+    else:
+        spec = campaign_spec(args.profiles, args.users, args.rate, args.runtime_burst, args.runtime_even,
+                             args.delay, args.reset_time)
+        name = "campaign"
+    duration = sum(stage.shape.duration for stage in stages_from_spec(spec))
+    print(f"Running {len(spec)} stages on {args.arch} for {duration:.0f}s")
+
+    results_dir = RESULTS_DIRS[args.arch]
+    os.makedirs(results_dir, exist_ok=True)
+    env = generator_env(args)
+    env[ARCHITECTURE_ENV] = args.arch
+    env[SCHEDULE_ENV] = json.dumps(spec)
+    logfile = f"{results_dir}/schedule_{name}_{args.iteration}"
+    logfile += ".log" if args.arrival == "closed" else f"_{args.arrival}.log"
+    sys.exit(run_locust(__file__, logfile, [], env, args.workers))